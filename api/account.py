@@ -3,6 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from database.database import get_db
 from auth.dependencies import get_current_user
+from utils.duplicates import invalidate_user_index
+from utils.cache import invalidate_flashcard_counts
+from utils.scheduler import invalidate_user_scheduler
 
 router = APIRouter()
 
@@ -33,6 +36,9 @@ async def delete_account(
         await db.execute(text('DELETE FROM "User" WHERE id = :user_id'), {"user_id": user_id})
 
         await db.commit()
+        invalidate_user_index(user_id)
+        invalidate_flashcard_counts(user_id)
+        invalidate_user_scheduler(user_id)
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete account: {str(e)}")
\ No newline at end of file
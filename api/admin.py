@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_db
+from auth.dependencies import get_admin_user
+from utils.gpt import gpt_pool
+from utils.cache import cache_metrics, purge_flashcard_cache
+from utils.cedict import cedict_metrics
+from utils.semantic import semantic_metrics
+from utils.duplicates import duplicate_index_metrics
+from utils.language import language_cache_metrics
+from utils.phonetic import phonetic_service
+from utils.scheduler import review_forecast
+from api.schemas import ReviewForecastResponse
+
+router = APIRouter()
+
+@router.get("/admin/metrics")
+async def get_metrics(admin_id: str = Depends(get_admin_user)):
+    return {
+        "gpt": gpt_pool.metrics(),
+        "cache": cache_metrics(),
+        "cedict": cedict_metrics(),
+        "semantic": semantic_metrics(),
+        "duplicate_index": duplicate_index_metrics(),
+        "language": language_cache_metrics(),
+        "phonetic": phonetic_service.metrics(),
+    }
+
+@router.delete("/admin/cache")
+async def purge_cache(
+    word: str | None = Query(None),
+    source_lang: str | None = Query(None),
+    target_lang: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    admin_id: str = Depends(get_admin_user)
+):
+    return await purge_flashcard_cache(db, word, source_lang, target_lang)
+
+# Due reviews across all users per day, for sizing database write capacity
+@router.get("/admin/review-forecast", response_model=ReviewForecastResponse)
+async def get_review_forecast(
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_db),
+    admin_id: str = Depends(get_admin_user)
+):
+    forecast = await review_forecast(db, days)
+    return {"days": forecast, "total": sum(day["count"] for day in forecast)}
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import update, delete, exists, or_
+from models import Flashcard, Folder, ReviewEvent, QuizAnswerLog
+from database.database import get_db
+from auth.dependencies import get_current_user
+from utils.cache import invalidate_flashcard_counts
+from utils.duplicates import invalidate_user_index
+from api.schemas import (
+  FlashcardSelection,
+  FlashcardBulkMove,
+  FlashcardBulkDelete,
+  FlashcardBulkUpdate,
+  BulkOperationResult,
+)
+from datetime import date
+
+router = APIRouter()
+
+# WHERE clauses for a selection; the user_id clause is what scopes every bulk
+# statement to the caller's own cards
+def selection_clauses(selection: FlashcardSelection, user_id: str) -> list:
+    clauses = []
+    if selection.ids:
+        clauses.append(Flashcard.id.in_(selection.ids))
+    if selection.folder_id:
+        clauses.append(Flashcard.folder_id == selection.folder_id)
+    if selection.unfiled:
+        clauses.append(Flashcard.folder_id.is_(None))
+    if selection.source_lang:
+        clauses.append(Flashcard.source_lang == selection.source_lang)
+    if selection.target_lang:
+        clauses.append(Flashcard.target_lang == selection.target_lang)
+    if selection.pos:
+        clauses.append(Flashcard.pos == selection.pos)
+    if selection.due is True:
+        clauses.append(Flashcard.next_review_date <= date.today())
+    elif selection.due is False:
+        clauses.append(or_(Flashcard.next_review_date.is_(None), Flashcard.next_review_date > date.today()))
+
+    if not clauses and not selection.all:
+        raise HTTPException(status_code=400, detail="Selection is empty; pass ids, a filter, or all=true")
+    return [Flashcard.user_id == user_id, *clauses]
+
+@router.post("/flashcards/bulk/move", response_model=BulkOperationResult)
+async def bulk_move_flashcards(
+    payload: FlashcardBulkMove,
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user)
+):
+    statement = update(Flashcard).where(*selection_clauses(payload.selection, user_id)).values(folder_id=payload.folder_id)
+    if payload.folder_id:
+        # Target folder ownership is part of the UPDATE itself
+        statement = statement.where(exists().where(Folder.id == payload.folder_id, Folder.user_id == user_id))
+
+    result = await db.execute(statement.execution_options(synchronize_session=False))
+    await db.commit()
+
+    if result.rowcount == 0 and payload.folder_id:
+        folder_result = await db.execute(
+            select(Folder.id).where(Folder.id == payload.folder_id, Folder.user_id == user_id)
+        )
+        if folder_result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Folder not found")
+
+    invalidate_flashcard_counts(user_id)
+    return {"affected": result.rowcount}
+
+# Deletes the selected cards. Their ReviewEvent and QuizAnswerLog rows are kept with the
+# card link cleared (ON DELETE SET NULL), so /stats and review streaks are unchanged, as
+# with single-card delete. purge_history=true deletes that history as well, which
+# rewrites the user's stats and removes it from FSRS fitting.
+@router.post("/flashcards/bulk/delete", response_model=BulkOperationResult)
+async def bulk_delete_flashcards(
+    payload: FlashcardBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user)
+):
+    clauses = selection_clauses(payload.selection, user_id)
+    selected_ids = select(Flashcard.id).where(*clauses)
+
+    try:
+        if payload.purge_history:
+            # Before the cards, while the events still point at them; same transaction
+            await db.execute(
+                delete(ReviewEvent).where(ReviewEvent.flashcard_id.in_(selected_ids)).execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                delete(QuizAnswerLog).where(QuizAnswerLog.flashcard_id.in_(selected_ids)).execution_options(synchronize_session=False)
+            )
+        result = await db.execute(delete(Flashcard).where(*clauses).execution_options(synchronize_session=False))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    if result.rowcount:
+        invalidate_user_index(user_id)
+        invalidate_flashcard_counts(user_id)
+    return {"affected": result.rowcount}
+
+@router.patch("/flashcards/bulk", response_model=BulkOperationResult)
+async def bulk_update_flashcards(
+    payload: FlashcardBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user)
+):
+    changes = payload.dict(exclude_unset=True, exclude={"selection"})
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    statement = update(Flashcard).where(*selection_clauses(payload.selection, user_id)).values(**changes)
+    result = await db.execute(statement.execution_options(synchronize_session=False))
+    await db.commit()
+    return {"affected": result.rowcount}
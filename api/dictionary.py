@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from auth.dependencies import get_current_user
+from utils.cedict import get_cedict
+from utils.semantic import semantic_available, reverse_lookup
+
+router = APIRouter()
+
+def get_dictionary():
+    dictionary = get_cedict()
+    if dictionary is None:
+        raise HTTPException(status_code=503, detail="Dictionary not loaded")
+    return dictionary
+
+@router.get("/dictionary/lookup")
+async def lookup_word(
+    q: str = Query(..., min_length=1),
+    prefix: bool = Query(False),
+    limit: int = Query(20, ge=1, le=100),
+    user_id: str = Depends(get_current_user),
+):
+    dictionary = get_dictionary()
+    word = q.strip()
+
+    if prefix:
+        return [{"headword": key, "entries": entries} for key, entries in dictionary.prefix(word, limit)]
+
+    entries = dictionary.lookup(word)
+    if not entries:
+        raise HTTPException(status_code=404, detail="Word not found")
+    return [{"headword": word, "entries": entries}]
+
+# English gloss -> closest CEDICT headwords by embedding similarity
+@router.get("/dictionary/reverse")
+async def reverse_lookup_word(
+    q: str = Query(..., min_length=1, max_length=200),
+    k: int = Query(10, ge=1, le=50),
+    exact: bool = Query(False),
+    user_id: str = Depends(get_current_user),
+):
+    if not semantic_available():
+        raise HTTPException(status_code=503, detail="Semantic lookup not available")
+    return await reverse_lookup(q, k=k, exact=exact)
@@ -0,0 +1,138 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.future import select
+from models import Flashcard, Folder, ReviewEvent
+from database.database import AsyncSessionLocal
+from auth.dependencies import get_current_user
+from datetime import date, datetime
+import csv
+import io
+import json
+import os
+
+# Rows fetched per round-trip from the server-side cursor, and rows per response chunk
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+
+router = APIRouter()
+
+# Plain column selects (not ORM entities) so streamed rows never pile up in the identity map
+EXPORT_COLUMNS = {
+    "folders": (Folder, [Folder.id, Folder.name, Folder.created_at]),
+    # Listed explicitly so derived or internal columns (search_text, FSRS memory state)
+    # never leak into the export format as the model grows
+    "flashcards": (Flashcard, [
+        Flashcard.id,
+        Flashcard.folder_id,
+        Flashcard.word,
+        Flashcard.translation,
+        Flashcard.phonetic,
+        Flashcard.pos,
+        Flashcard.example,
+        Flashcard.notes,
+        Flashcard.source_lang,
+        Flashcard.target_lang,
+        Flashcard.review_count,
+        Flashcard.last_reviewed,
+        Flashcard.next_review_date,
+        Flashcard.ease_factor,
+        Flashcard.interval,
+        Flashcard.created_at,
+    ]),
+    "reviews": (ReviewEvent, [
+        ReviewEvent.id,
+        ReviewEvent.session_id,
+        ReviewEvent.flashcard_id,
+        ReviewEvent.rating,
+        ReviewEvent.created_at,
+    ]),
+}
+# Folders first so an importer can create them before the cards that reference them
+EXPORT_ORDER = ("folders", "flashcards", "reviews")
+EXPORT_TYPES = {"folders": "folder", "flashcards": "flashcard", "reviews": "review"}
+
+
+def export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def export_query(resource: str, user_id: str, folder_id: str | None):
+    model, columns = EXPORT_COLUMNS[resource]
+    query = select(*columns).where(model.user_id == user_id)
+    if folder_id:
+        if resource == "folders":
+            query = query.where(Folder.id == folder_id)
+        elif resource == "flashcards":
+            query = query.where(Flashcard.folder_id == folder_id)
+        else:
+            query = query.join(Flashcard, Flashcard.id == ReviewEvent.flashcard_id).where(Flashcard.folder_id == folder_id)
+    return query.execution_options(yield_per=EXPORT_CHUNK_ROWS)
+
+
+# Yields lists of row mappings, one list per cursor fetch
+async def stream_rows(db, resource: str, user_id: str, folder_id: str | None):
+    result = await db.stream(export_query(resource, user_id, folder_id))
+    async for partition in result.mappings().partitions():
+        yield partition
+
+
+async def stream_ndjson(resources: list, user_id: str, folder_id: str | None):
+    # Sent before the first query so the client sees bytes immediately
+    yield json.dumps({"type": "export", "resources": resources, "exported_at": datetime.utcnow().isoformat()}) + "\n"
+
+    # own session: the request-scoped one may be closed before streaming ends
+    async with AsyncSessionLocal() as db:
+        for resource in resources:
+            row_type = EXPORT_TYPES[resource]
+            async for rows in stream_rows(db, resource, user_id, folder_id):
+                yield "".join(
+                    json.dumps({"type": row_type, **{k: export_value(v) for k, v in row.items()}}, ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+
+
+async def stream_csv(resource: str, user_id: str, folder_id: str | None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow([c.name for c in EXPORT_COLUMNS[resource][1]])
+    yield flush()
+
+    async with AsyncSessionLocal() as db:
+        async for rows in stream_rows(db, resource, user_id, folder_id):
+            writer.writerows([export_value(v) for v in row.values()] for row in rows)
+            yield flush()
+
+
+@router.get("/export")
+async def export_deck(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    resource: str | None = Query(None, pattern="^(folders|flashcards|reviews)$"),
+    folder_id: str | None = Query(None),
+    user_id: str = Depends(get_current_user)
+):
+    if format == "csv":
+        # One table per CSV file
+        if resource is None:
+            raise HTTPException(status_code=400, detail="CSV export needs ?resource=folders|flashcards|reviews")
+        body = stream_csv(resource, user_id, folder_id)
+        media_type = "text/csv; charset=utf-8"
+        filename = f"{resource}.csv"
+    else:
+        resources = [resource] if resource else list(EXPORT_ORDER)
+        body = stream_ndjson(resources, user_id, folder_id)
+        media_type = "application/x-ndjson"
+        filename = f"{resource or 'flashcards-export'}.ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
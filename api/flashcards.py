@@ -1,29 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Body
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import func, insert, tuple_, or_, case, literal
 from models import Flashcard, Folder
-from database.database import get_db
-from utils.utils import generate_flashcard_with_gpt, get_phonetic, detect_language
+from models.flashcard import search_vector, search_tsquery
+from database.database import get_db, AsyncSessionLocal
+from utils.utils import get_phonetic, get_phonetics, detect_language
+from utils.cache import (
+  flashcard_count_cache,
+  invalidate_flashcard_counts,
+  get_flashcard_content,
+  iter_flashcard_content,
+  lookup_flashcard_content,
+  remember_flashcard_content,
+  await_generation_flight,
+  generation_flights,
+  content_key,
+)
+from utils.gpt import stream_flashcard_with_gpt
+from utils.cedict import lookup_cedict
+from utils.pagination import encode_cursor, decode_cursor
+from utils.search import build_search_text, normalize_search_text, escape_like
+from utils.projection import parse_fields, projection_columns, row_serializer
+from utils.responses import ResponseEncoder, negotiate_encoding
+from utils.scheduler import review_forecast
+from utils.duplicates import (
+  get_user_index,
+  card_vectors,
+  duplicate_groups,
+  index_card,
+  unindex_card,
+  DUPLICATE_THRESHOLD,
+  invalidate_user_index,
+)
+from utils.importers import (
+  IMPORT_FORMATS,
+  IMPORT_MAX_ROWS,
+  IMPORT_BATCH_SIZE,
+  ImportTooLarge,
+  detect_import_format,
+  spool_upload,
+  iter_import_rows,
+  validate_import_row,
+)
 from api.schemas import (
   PaginatedFlashcardResponse,
   FlashcardUpdate,
   FlashcardSubmit,
   FlashcardResponse,
   FlashcardCreate,
+  FlashcardBatchCreate,
   FlashcardFolderUpdate,
   FlashcardPreview,
   SpacedRepetitionMetadata,
-  FlashcardReviewPreview
+  FlashcardReviewPreview,
+  FlashcardSearchResponse,
+  ReviewForecastResponse
 )
 from auth.dependencies import get_current_user
-from datetime import date, timedelta
+from datetime import date, datetime
+from itertools import islice
 from typing import List
+import asyncio
+import io
+import json
 import uuid
 import os
 
 SECRET_KEY = os.getenv("NEXTAUTH_SECRET")
 ALGORITHM = "HS256"
+BATCH_PREVIEW_MAX_WORDS = int(os.getenv("BATCH_PREVIEW_MAX_WORDS", "50"))
+# Edits to these fields rebuild Flashcard.search_text
+SEARCHED_FIELDS = {"word", "translation", "phonetic", "notes", "example"}
 
 router = APIRouter()
 
@@ -50,6 +99,15 @@ def to_flashcard_response(flashcard: Flashcard) -> FlashcardResponse:
       )
   )
 
+# ?fields=word,translation selects only those columns; rows skip the ORM and response models
+def get_flashcard_fields(
+    fields: str | None = Query(None, description="comma-separated FlashcardResponse fields; default all")
+) -> tuple:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.delete("/flashcard/{flashcard_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_flashcard(
     flashcard_id: str,
@@ -66,30 +124,126 @@ async def delete_flashcard(
 
     await db.delete(flashcard)
     await db.commit()
-
+    unindex_card(user_id, flashcard_id)
+    invalidate_flashcard_counts(user_id)
+
+async def count_flashcards(db: AsyncSession, user_id: str, folder_id: str | None, fresh: bool = False) -> int:
+    key = (user_id, folder_id)
+    total = None if fresh else flashcard_count_cache.get(key)
+    if total is None:
+        count_query = select(func.count()).select_from(Flashcard).where(Flashcard.user_id == user_id)
+        if folder_id:
+            count_query = count_query.where(Flashcard.folder_id == folder_id)
+        count_result = await db.execute(count_query)
+        total = count_result.scalar_one()
+        flashcard_count_cache.set(key, total)
+    return total
+
+# Newest first. Pass next_cursor back as ?cursor= for the following page; every page
+# is then one index range scan. skip still works but gets slower the deeper it goes.
 @router.get("/flashcards", response_model=PaginatedFlashcardResponse)
 async def get_flashcards(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     folder_id: str | None = Query(None),
+    cursor: str | None = Query(None),
+    include_total: bool = Query(False, description="recount instead of using the cached total"),
+    fields: tuple = Depends(get_flashcard_fields),
+    encoder: ResponseEncoder = Depends(negotiate_encoding),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user),
 ):
-    base_query = select(Flashcard).where(Flashcard.user_id == user_id)
-    count_query = select(func.count()).select_from(Flashcard).where(Flashcard.user_id == user_id)
+    base_query = select(
+        *projection_columns(fields),
+        Flashcard.created_at.label("cursor_created_at"),
+        Flashcard.id.label("cursor_id"),
+    ).where(Flashcard.user_id == user_id)
 
     if folder_id:
         base_query = base_query.where(Flashcard.folder_id == folder_id)
-        count_query = count_query.where(Flashcard.folder_id == folder_id)
 
-    result = await db.execute(base_query.offset(skip).limit(limit))
-    flashcards = result.scalars().all()
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor, 2)
+            created_at, last_id = datetime.fromisoformat(created_at), str(last_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        base_query = base_query.where(tuple_(Flashcard.created_at, Flashcard.id) < (created_at, last_id))
+    elif skip:
+        base_query = base_query.offset(skip)
+
+    # One extra row tells us whether there is a next page
+    result = await db.execute(
+        base_query.order_by(Flashcard.created_at.desc(), Flashcard.id.desc()).limit(limit + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].cursor_created_at, rows[-1].cursor_id)
+
+    total = await count_flashcards(db, user_id, folder_id, fresh=include_total)
+
+    serialize = row_serializer(fields)
+    return encoder.response({
+        "total": total,
+        "flashcards": [serialize(row) for row in rows],
+        "next_cursor": next_cursor,
+    })
+
+
+# Matches the normalized query as a substring (trigram index), as words (full-text
+# index) or fuzzily; pinyin with or without tones and traditional characters all
+# normalize to the same search_text terms
+@router.get("/flashcards/search", response_model=FlashcardSearchResponse)
+async def search_flashcards(
+    q: str = Query(..., min_length=1, max_length=100),
+    folder_id: str | None = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    encoder: ResponseEncoder = Depends(negotiate_encoding),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user)
+):
+    query_text = normalize_search_text(q)
+    if not query_text:
+        raise HTTPException(status_code=400, detail="Search query has no searchable characters")
+
+    vector = search_vector(Flashcard.search_text)
+    ts_query = search_tsquery(query_text)
+    score = (
+        func.ts_rank(vector, ts_query)
+        + func.word_similarity(query_text, Flashcard.search_text)
+        + case((func.lower(Flashcard.word) == q.strip().lower(), 1.0), else_=0.0)
+    )
 
-    count_result = await db.execute(count_query)
-    total = count_result.scalar_one()
+    search_query = select(Flashcard).where(
+        Flashcard.user_id == user_id,
+        or_(
+            vector.op("@@")(ts_query),
+            Flashcard.search_text.ilike(f"%{escape_like(query_text)}%", escape="\\"),
+            literal(query_text).op("<%")(Flashcard.search_text),
+        ),
+    )
+    if folder_id:
+        search_query = search_query.where(Flashcard.folder_id == folder_id)
 
-    return {"total": total, "flashcards": [to_flashcard_response(f) for f in flashcards]}
+    result = await db.execute(
+        search_query.order_by(score.desc(), Flashcard.id).offset(offset).limit(limit + 1)
+    )
+    flashcards = result.scalars().all()
 
+    next_offset = None
+    if len(flashcards) > limit:
+        flashcards = flashcards[:limit]
+        next_offset = offset + limit
+
+    response = FlashcardSearchResponse(
+        flashcards=[to_flashcard_response(f) for f in flashcards],
+        next_offset=next_offset,
+    )
+    return encoder.response(response, FlashcardSearchResponse)
 
 @router.get("/flashcard/{flashcard_id}", response_model=FlashcardResponse)
 async def get_flashcard_detail(
@@ -110,6 +264,7 @@ async def get_flashcard_detail(
 @router.post("/flashcard", response_model=FlashcardResponse)
 async def save_flashcard(
     flashcard_data: FlashcardSubmit,
+    allow_duplicate: bool = Query(False),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user)
 ):
@@ -117,6 +272,19 @@ async def save_flashcard(
     if not word:
         raise HTTPException(status_code=400, detail="Missing word")
 
+    vector = card_vectors([(word, flashcard_data.translation)])[0]
+    if not allow_duplicate:
+        index = await get_user_index(user_id)
+        matches = index.query(vector)
+        if matches:
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": "A similar flashcard already exists",
+                    "duplicates": [{"id": card_id, "score": score} for card_id, score in matches],
+                },
+            )
+
     new_flashcard = Flashcard(
         id=str(uuid.uuid4()),
         word=word,
@@ -129,13 +297,139 @@ async def save_flashcard(
         target_lang=flashcard_data.target_lang,
         folder_id=flashcard_data.folder_id,
         user_id=user_id,
+        search_text=build_search_text(
+            word,
+            flashcard_data.translation,
+            flashcard_data.phonetic,
+            flashcard_data.notes,
+            flashcard_data.example,
+        ),
     )
 
     db.add(new_flashcard)
     await db.commit()
     await db.refresh(new_flashcard)
+    index_card(user_id, new_flashcard.id, new_flashcard.word, new_flashcard.translation)
+    invalidate_flashcard_counts(user_id)
     return to_flashcard_response(new_flashcard)
 
+# Body is the raw file (not multipart); format comes from ?format= or the Content-Type.
+# Streams NDJSON progress while rows are validated and inserted in one transaction.
+@router.post("/flashcards/import")
+async def import_flashcards(
+    request: Request,
+    format: str | None = Query(None, pattern="^(csv|jsonl|anki)$"),
+    folder_id: str | None = Query(None),
+    source_lang: str = Query("en"),
+    target_lang: str = Query("zh"),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user)
+):
+    fmt = format or detect_import_format(request.headers.get("content-type"))
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unknown import format; pass ?format=csv|jsonl|anki")
+
+    # Folder ownership checked once up front instead of per row
+    folder_result = await db.execute(select(Folder.id).where(Folder.user_id == user_id))
+    folder_ids = set(folder_result.scalars().all())
+    if folder_id and folder_id not in folder_ids:
+        raise HTTPException(status_code=404, detail="Folder not found")
+
+    try:
+        spool = await spool_upload(request.stream())
+    except ImportTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    defaults = {"source_lang": source_lang, "target_lang": target_lang, "folder_id": folder_id}
+
+    async def stream():
+        text = io.TextIOWrapper(spool, encoding="utf-8-sig", errors="replace", newline="")
+        rows = iter_import_rows(text, fmt)
+        processed, inserted, errors = 0, 0, []
+
+        def read_batch():
+            return list(islice(rows, IMPORT_BATCH_SIZE))
+
+        try:
+            # own session: the request-scoped one may be closed before streaming ends
+            async with AsyncSessionLocal() as session:
+                try:
+                    truncated = False
+                    while not truncated:
+                        batch = await asyncio.to_thread(read_batch)
+                        if not batch:
+                            break
+                        if processed + len(batch) > IMPORT_MAX_ROWS:
+                            batch = batch[:IMPORT_MAX_ROWS - processed]
+                            truncated = True
+                        processed += len(batch)
+
+                        values = []
+                        for line_number, row, error in batch:
+                            try:
+                                if error:
+                                    raise ValueError(error)
+                                values.append(validate_import_row(row, defaults, folder_ids))
+                            except ValueError as e:
+                                errors.append({"line": line_number, "error": str(e)})
+
+                        zh_cards = [v for v in values if v["source_lang"] == "zh" and not v["phonetic"]]
+                        for card, phonetic in zip(zh_cards, get_phonetics([v["word"] for v in zh_cards], lang="zh")):
+                            card["phonetic"] = phonetic
+
+                        if values:
+                            for card in values:
+                                card["user_id"] = user_id
+                                card["search_text"] = build_search_text(
+                                    card["word"], card["translation"], card["phonetic"], card["notes"], card["example"]
+                                )
+                            await session.execute(insert(Flashcard), values)
+                            inserted += len(values)
+
+                        yield json.dumps({"event": "progress", "processed": processed, "inserted": inserted, "errors": len(errors)}) + "\n"
+
+                    if truncated:
+                        errors.append({"line": None, "error": f"Import stopped after {IMPORT_MAX_ROWS} rows"})
+
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    yield json.dumps({"event": "failed", "processed": processed, "inserted": 0, "detail": str(e)}) + "\n"
+                    return
+        finally:
+            text.close()
+
+        if inserted:
+            invalidate_user_index(user_id)
+            invalidate_flashcard_counts(user_id)
+        yield json.dumps({"event": "done", "processed": processed, "inserted": inserted, "errors": errors}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/flashcards/duplicates")
+async def find_duplicate_flashcards(
+    threshold: float = Query(DUPLICATE_THRESHOLD, ge=0.5, le=1.0),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user)
+):
+    index = await get_user_index(user_id)
+    # Saves and deletes keep mutating the index on the event loop, so the thread works on a copy
+    groups = await asyncio.to_thread(duplicate_groups, *index.snapshot(), threshold)
+    if not groups:
+        return []
+
+    card_ids = [card_id for group in groups for card_id in group]
+    result = await db.execute(
+        select(Flashcard.id, Flashcard.word, Flashcard.translation, Flashcard.folder_id, Flashcard.created_at)
+        .where(Flashcard.user_id == user_id, Flashcard.id.in_(card_ids))
+    )
+    cards = {row.id: dict(row._mapping) for row in result.all()}
+
+    return [
+        {"flashcards": [cards[card_id] for card_id in group if card_id in cards]}
+        for group in groups
+    ]
+
 @router.put("/flashcard/{flashcard_id}", response_model=FlashcardResponse)
 async def update_flashcard(
     flashcard_id: str,
@@ -151,11 +445,23 @@ async def update_flashcard(
     if not flashcard:
         raise HTTPException(status_code=404, detail="Flashcard not found")
 
-    for field, value in update_data.dict(exclude_unset=True).items():
+    changes = update_data.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(flashcard, field, value)
 
+    if changes.keys() & SEARCHED_FIELDS:
+        flashcard.search_text = build_search_text(
+            flashcard.word,
+            flashcard.translation,
+            flashcard.phonetic,
+            flashcard.notes,
+            flashcard.example,
+        )
+
     await db.commit()
     await db.refresh(flashcard)
+    index_card(user_id, flashcard.id, flashcard.word, flashcard.translation)
+    invalidate_flashcard_counts(user_id)
     return to_flashcard_response(flashcard)
 
 @router.put("/flashcard/{flashcard_id}/folder", response_model=FlashcardResponse)
@@ -183,11 +489,42 @@ async def assign_flashcard_to_folder(
     flashcard.folder_id = folder_update.folder_id
     await db.commit()
     await db.refresh(flashcard)
+    invalidate_flashcard_counts(user_id)
     return to_flashcard_response(flashcard)
 
+def resolve_languages(word: str, source_lang: str, target_lang: str):
+    # Auto-detect source language if needed
+    if source_lang == "auto":
+        source_lang = detect_language(word)
+
+    if target_lang == "auto":
+        target_lang = "zh" if source_lang == "en" else "en"
+
+    return source_lang, target_lang
+
+# Offline answer for Chinese words covered by CC-CEDICT (no example/notes)
+def dictionary_preview(word: str, source_lang: str, target_lang: str) -> FlashcardPreview | None:
+    if source_lang != "zh" or target_lang != "en":
+        return None
+    entry = lookup_cedict(word)
+    if entry is None:
+        return None
+    return FlashcardPreview(
+        word=word,
+        translation=entry["translation"],
+        phonetic=entry["phonetic"],
+        pos="",
+        example="",
+        notes="",
+        source_lang=source_lang,
+        target_lang=target_lang,
+        traditional=entry["traditional"]
+    )
+
 @router.post("/flashcard-preview", response_model=FlashcardPreview)
 async def preview_flashcard(
     payload: FlashcardCreate,
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user)
 ):
     word = payload.word.strip()
@@ -197,14 +534,14 @@ async def preview_flashcard(
     if not word:
         raise HTTPException(status_code=400, detail="Word is required")
 
-    # Auto-detect source language if needed
-    if source_lang == "auto":
-        source_lang = detect_language(word)
+    source_lang, target_lang = resolve_languages(word, source_lang, target_lang)
 
-    if target_lang == "auto":
-        target_lang = "zh" if source_lang == "en" else "en"
+    if not payload.enrich:
+        preview = dictionary_preview(word, source_lang, target_lang)
+        if preview is not None:
+            return preview
 
-    translation, example, notes, pos = generate_flashcard_with_gpt(word, source_lang, target_lang)
+    translation, example, notes, pos = await get_flashcard_content(db, word, source_lang, target_lang)
 
     return FlashcardPreview(
         word=word,
@@ -217,6 +554,138 @@ async def preview_flashcard(
         target_lang=target_lang
     )
 
+@router.post("/flashcard-preview/batch")
+async def preview_flashcards_batch(
+    payload: FlashcardBatchCreate,
+    user_id: str = Depends(get_current_user)
+):
+    words = list(dict.fromkeys(w.strip() for w in payload.words if w.strip()))
+    if not words:
+        raise HTTPException(status_code=400, detail="At least one word is required")
+    if len(words) > BATCH_PREVIEW_MAX_WORDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_PREVIEW_MAX_WORDS} words per batch")
+
+    items = [
+        (word, *resolve_languages(word, payload.source_lang or "en", payload.target_lang or "zh"))
+        for word in words
+    ]
+
+    dictionary_hits = []
+    if not payload.enrich:
+        remaining = []
+        for item in items:
+            preview = dictionary_preview(*item)
+            if preview is not None:
+                dictionary_hits.append(preview)
+            else:
+                remaining.append(item)
+        items = remaining
+
+    # Streams one FlashcardPreview per line as each word completes
+    async def stream():
+        for preview in dictionary_hits:
+            yield json.dumps(preview.dict(), ensure_ascii=False) + "\n"
+        if not items:
+            return
+
+        # One pypinyin pass for every Chinese word instead of one per preview
+        zh_words = [word for word, source_lang, _ in items if source_lang == "zh"]
+        phonetics = dict(zip(zh_words, get_phonetics(zh_words, lang="zh")))
+
+        # own session: the request-scoped one may be closed before streaming ends
+        async with AsyncSessionLocal() as db:
+            async for (word, source_lang, target_lang), content in iter_flashcard_content(db, items):
+                translation, example, notes, pos = content
+                preview = FlashcardPreview(
+                    word=word,
+                    translation=translation,
+                    phonetic=phonetics.get(word) if source_lang == "zh" else get_phonetic(word, lang=source_lang),
+                    pos=pos,
+                    example=example,
+                    notes=notes,
+                    source_lang=source_lang,
+                    target_lang=target_lang
+                )
+                yield json.dumps(preview.dict(), ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/flashcard-preview/stream")
+async def stream_flashcard_preview(
+    payload: FlashcardCreate,
+    user_id: str = Depends(get_current_user)
+):
+    word = payload.word.strip()
+    if not word:
+        raise HTTPException(status_code=400, detail="Word is required")
+
+    source_lang, target_lang = resolve_languages(word, payload.source_lang or "en", payload.target_lang or "zh")
+    dictionary_hit = None if payload.enrich else dictionary_preview(word, source_lang, target_lang)
+    phonetic = dictionary_hit.phonetic if dictionary_hit else get_phonetic(word, lang=source_lang)
+
+    # Emits "meta", then one event per field as its line completes, then "done" with the full FlashcardPreview
+    async def stream():
+        yield sse_event("meta", {
+            "word": word,
+            "phonetic": phonetic,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+        })
+
+        if dictionary_hit is not None:
+            for field in ("translation", "example", "notes", "pos"):
+                yield sse_event(field, getattr(dictionary_hit, field))
+            yield sse_event("done", dictionary_hit.dict())
+            return
+
+        async with AsyncSessionLocal() as db:
+            fields = {"translation": "", "example": "", "notes": "", "pos": ""}
+            content = await await_generation_flight(word, source_lang, target_lang)
+            if content is None:
+                content = await lookup_flashcard_content(db, word, source_lang, target_lang)
+            if content is not None:
+                fields.update(zip(fields, content))
+                for field, value in fields.items():
+                    yield sse_event(field, value)
+            else:
+                # Lead the flight so identical concurrent previews wait for this stream
+                flight = generation_flights.lead(content_key(word, source_lang, target_lang))
+                try:
+                    async for field, value in stream_flashcard_with_gpt(word, source_lang, target_lang):
+                        fields[field] = value
+                        yield sse_event(field, value)
+                    if not fields["translation"]:
+                        fields["translation"] = "Translation unavailable"
+                    flight.set_result(tuple(fields.values()))
+                except Exception as e:
+                    print(f"[GPT Stream Error] {str(e)}")
+                    flight.set_exception(e)
+                    yield sse_event("error", {"detail": "Generation failed"})
+                    return
+                finally:
+                    if not flight.done():
+                        flight.set_exception(RuntimeError("Stream abandoned"))
+
+                await remember_flashcard_content(db, word, source_lang, target_lang, tuple(fields.values()))
+
+        preview = FlashcardPreview(
+            word=word,
+            phonetic=phonetic,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            **fields
+        )
+        yield sse_event("done", preview.dict())
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/flashcard/{flashcard_id}", response_model=FlashcardResponse)
 async def get_flashcard_detail(
     flashcard_id: str,
@@ -233,20 +702,73 @@ async def get_flashcard_detail(
 
     return to_flashcard_response(flashcard)
 
+# Most overdue first; every due card unless ?limit= is given. With a limit and more cards
+# due, X-Next-Cursor holds the cursor for the following page (exposed through CORS in
+# main.py); each page is one range scan of ix_flashcard_user_due.
 @router.get("/flashcards/review", response_model=List[FlashcardResponse])
 async def get_due_flashcards(
+    limit: int | None = Query(None, ge=1, le=500),
+    cursor: str | None = Query(None),
+    fields: tuple = Depends(get_flashcard_fields),
+    encoder: ResponseEncoder = Depends(negotiate_encoding),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user)
 ):
     today = date.today()
-    result = await db.execute(
-        select(Flashcard)
+    query = (
+        select(
+            *projection_columns(fields),
+            Flashcard.next_review_date.label("cursor_due"),
+            Flashcard.id.label("cursor_id"),
+        )
         .where(Flashcard.user_id == user_id)
         .where(Flashcard.next_review_date <= today)
-        .order_by(Flashcard.next_review_date.asc())
     )
-    flashcards = result.scalars().all()
-    return [to_flashcard_response(f) for f in flashcards]
+    if cursor:
+        try:
+            due, last_id = decode_cursor(cursor, 2)
+            due, last_id = date.fromisoformat(due), str(last_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Flashcard.next_review_date, Flashcard.id) > (due, last_id))
+
+    query = query.order_by(Flashcard.next_review_date.asc(), Flashcard.id.asc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    result = await db.execute(query)
+    rows = result.all()
+
+    headers = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        headers = {"X-Next-Cursor": encode_cursor(rows[-1].cursor_due, rows[-1].cursor_id)}
+
+    serialize = row_serializer(fields)
+    return encoder.response([serialize(row) for row in rows], headers=headers)
+
+# Counted from ix_flashcard_user_due alone; no card rows are read
+@router.get("/flashcards/review/count")
+async def count_due_flashcards(
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user)
+):
+    due_count = await db.scalar(
+        select(func.count())
+        .select_from(Flashcard)
+        .where(Flashcard.user_id == user_id)
+        .where(Flashcard.next_review_date <= date.today())
+    )
+    return {"due_count": due_count}
+
+# Daily due counts for capacity planning, e.g. ?days=30 or ?days=90
+@router.get("/flashcards/review/forecast", response_model=ReviewForecastResponse)
+async def forecast_reviews(
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user)
+):
+    forecast = await review_forecast(db, days, user_id)
+    return {"days": forecast, "total": sum(day["count"] for day in forecast)}
 
 @router.post("/flashcards/{flashcard_id}/review", response_model=FlashcardResponse)
 async def review_flashcard(
@@ -256,58 +778,14 @@ async def review_flashcard(
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user)
 ):
-    from models.review import ReviewEvent, ReviewSession
+    # api.review imports this module, so import here
+    from api.review import record_review
 
     if quality < 0 or quality > 5:
         raise HTTPException(status_code=400, detail="Quality must be between 0 and 5")
 
-    # Validate session
-    session_check = await db.execute(
-        select(ReviewSession).where(ReviewSession.id == session_id, ReviewSession.user_id == user_id)
-    )
-    session = session_check.scalar_one_or_none()
-    if not session:
-        raise HTTPException(status_code=404, detail="Invalid or expired review session.")
-
-    # Fetch flashcard
-    result = await db.execute(
-        select(Flashcard)
-        .where(Flashcard.id == flashcard_id)
-        .where(Flashcard.user_id == user_id)
-    )
-    flashcard = result.scalar_one_or_none()
-    if not flashcard:
-        raise HTTPException(status_code=404, detail="Flashcard not found")
-
-    # SM-2 Logic
-    if quality < 3:
-        flashcard.interval = 1
-        flashcard.review_count = 0
-    else:
-        flashcard.review_count += 1
-        if flashcard.review_count == 1:
-            flashcard.interval = 1
-        elif flashcard.review_count == 2:
-            flashcard.interval = 6
-        else:
-            flashcard.interval = int(flashcard.interval * flashcard.ease_factor)
-        flashcard.ease_factor = max(1.3, flashcard.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
-
-    flashcard.last_reviewed = date.today()
-    flashcard.next_review_date = flashcard.last_reviewed + timedelta(days=flashcard.interval)
-
-    # Record ReviewEvent
-    review_event = ReviewEvent(
-        id=str(uuid.uuid4()),
-        session_id=session.id,
-        user_id=user_id,
-        flashcard_id=flashcard.id,
-        rating=quality
-    )
-    db.add(review_event)
-
-    await db.commit()
-    await db.refresh(flashcard)
+    # Session check, SM-2 update and ReviewEvent insert in one statement
+    flashcard = await record_review(db, user_id, session_id, flashcard_id, quality)
     return to_flashcard_response(flashcard)
 
 @router.get("/flashcards/review/preview", response_model=List[FlashcardReviewPreview])
@@ -316,14 +794,24 @@ async def preview_upcoming_reviews(
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user)
 ):
+    # Same index as the due queue: the first limit entries of the user's range
     result = await db.execute(
-        select(Flashcard)
+        select(
+            Flashcard.id,
+            Flashcard.word,
+            Flashcard.translation,
+            Flashcard.phonetic,
+            Flashcard.pos,
+            Flashcard.example,
+            Flashcard.next_review_date,
+            Flashcard.interval,
+        )
         .where(Flashcard.user_id == user_id)
         .where(Flashcard.next_review_date.isnot(None))
-        .order_by(Flashcard.next_review_date.asc())
+        .order_by(Flashcard.next_review_date.asc(), Flashcard.id.asc())
         .limit(limit)
     )
-    flashcards = result.scalars().all()
+    flashcards = result.all()
 
     return [
         FlashcardReviewPreview(
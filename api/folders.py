@@ -6,7 +6,9 @@ from models import Folder, Flashcard
 from database.database import get_db
 from auth.dependencies import get_current_user
 from api.schemas import FolderCreate, FolderResponse, FlashcardResponse
-from api.flashcards import to_flashcard_response
+from api.flashcards import get_flashcard_fields
+from utils.projection import projection_columns, row_serializer
+from utils.responses import ResponseEncoder, negotiate_encoding
 import uuid
 
 router = APIRouter()
@@ -88,17 +90,18 @@ async def get_folder_detail(
 @router.get("/folder/{folder_id}/flashcards", response_model=list[FlashcardResponse])
 async def get_flashcards_by_folder(
     folder_id: str,
+    fields: tuple = Depends(get_flashcard_fields),
+    encoder: ResponseEncoder = Depends(negotiate_encoding),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user)
 ):
     result = await db.execute(
-        select(Flashcard).where(
+        select(*projection_columns(fields)).where(
             and_(
                 Flashcard.folder_id == folder_id,
                 Flashcard.user_id == user_id
             )
         )
     )
-    flashcards = result.scalars().all()
-
-    return [to_flashcard_response(f) for f in flashcards]
\ No newline at end of file
+    serialize = row_serializer(fields)
+    return encoder.response([serialize(row) for row in result.all()])
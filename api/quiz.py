@@ -2,11 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy import func
 from random import shuffle
 from typing import List
 import uuid
 from datetime import datetime
-from api.flashcards import to_flashcard_response
+from api.flashcards import get_flashcard_fields
+from utils.projection import projection_columns, row_serializer, reverse_card
+from utils.responses import ResponseEncoder, negotiate_encoding
 
 from database.database import get_db
 from auth.dependencies import get_current_user
@@ -27,51 +30,30 @@ async def get_quiz_cards(
     folder_id: str = Query(None),
     count: int = Query(10, ge=1, le=100),
     include_reverse: bool = Query(False),
+    fields: tuple = Depends(get_flashcard_fields),
+    encoder: ResponseEncoder = Depends(negotiate_encoding),
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_current_user),
 ):
-    query = select(Flashcard).where(Flashcard.user_id == user_id)
+    # The sample is drawn in the database rather than loading and shuffling the whole deck
+    query = select(*projection_columns(fields)).where(Flashcard.user_id == user_id)
 
     if folder_id and folder_id != "all":
         query = query.where(Flashcard.folder_id == folder_id)
 
-    result = await db.execute(query)
-    cards = result.scalars().all()
+    result = await db.execute(query.order_by(func.random()).limit(count))
+    serialize = row_serializer(fields)
+    selected = [serialize(row) for row in result.all()]
 
-    if not cards:
+    if not selected:
         raise HTTPException(status_code=404, detail="No flashcards found.")
 
-    shuffle(cards)
-    selected = cards[:count]
-
     if include_reverse:
-        reversed_cards = []
-        for card in selected:
-            reversed_card = Flashcard(
-                id=card.id,
-                word=card.translation,
-                translation=card.word,
-                phonetic=card.phonetic,
-                pos=card.pos,
-                example=card.example,
-                notes=card.notes,
-                folder_id=card.folder_id,
-                user_id=card.user_id,
-                source_lang=card.target_lang,
-                target_lang=card.source_lang,
-                review_count=card.review_count,
-                interval=card.interval,
-                ease_factor=card.ease_factor,
-                last_reviewed=card.last_reviewed,
-                next_review_date=card.next_review_date,
-                created_at=card.created_at,
-            )
-            reversed_cards.append(to_flashcard_response(reversed_card))
-        full_set = [to_flashcard_response(c) for c in selected] + reversed_cards
+        full_set = selected + [reverse_card(card) for card in selected]
         shuffle(full_set)
-        return full_set
+        return encoder.response(full_set)
 
-    return [to_flashcard_response(c) for c in selected]
+    return encoder.response(selected)
 
 # Create a new quiz session
 @router.post("/quiz/session", response_model=QuizSessionResponse)
@@ -1,17 +1,64 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
+from sqlalchemy import DateTime, SmallInteger, exists, insert, literal, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from database.database import get_db
 from auth.dependencies import get_current_user
 from models.review import ReviewSession, ReviewEvent
 from models.flashcard import Flashcard
-from api.schemas import FlashcardResponse
+from api.schemas import FlashcardResponse, ReviewBatch, ReviewBatchResult
 from api.flashcards import to_flashcard_response
-from datetime import date, timedelta
+from utils.scheduler import STATE_COLUMNS, get_user_scheduler, review_update, schedule_reviews
+from datetime import datetime
 import uuid
 
 router = APIRouter()
 
+# One statement for a single review: the UPDATE applies the user's scheduler in SQL only
+# if the caller owns both the card and the session, the INSERT records the event for
+# whatever row the UPDATE returned, and the outer SELECT hands back the new card state.
+# The connection is in autocommit so no BEGIN/COMMIT round-trips are added; the
+# statement is atomic.
+async def record_review(db: AsyncSession, user_id: str, session_id: str, flashcard_id: str, quality: int):
+    await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+    # Cached per worker, so normally no query
+    scheduler = await get_user_scheduler(db, user_id)
+
+    table = Flashcard.__table__
+    owns_session = exists().where(ReviewSession.id == session_id, ReviewSession.user_id == user_id)
+    reviewed = (
+        review_update(scheduler, quality, table.c.id == flashcard_id, table.c.user_id == user_id)
+        .where(owns_session)
+        .returning(*table.columns)
+        .cte("reviewed")
+    )
+    event = insert(ReviewEvent).from_select(
+        ["id", "session_id", "user_id", "flashcard_id", "rating", "created_at"],
+        select(
+            literal(str(uuid.uuid4())),
+            literal(session_id),
+            literal(user_id),
+            reviewed.c.id,
+            literal(quality, SmallInteger),
+            literal(datetime.utcnow(), DateTime),
+        ),
+    ).cte("event")
+
+    result = await db.execute(select(reviewed).add_cte(event))
+    flashcard = result.one_or_none()
+    if flashcard is not None:
+        return flashcard
+
+    # Nothing updated: one more query to say which of the two was missing
+    missing = await db.execute(select(
+        exists().where(ReviewSession.id == session_id, ReviewSession.user_id == user_id),
+        exists().where(Flashcard.id == flashcard_id, Flashcard.user_id == user_id),
+    ))
+    has_session, _ = missing.one()
+    if not has_session:
+        raise HTTPException(status_code=404, detail="Invalid or expired review session.")
+    raise HTTPException(status_code=404, detail="Flashcard not found")
+
 @router.post("/review-sessions/start")
 async def start_review_session(
     db: AsyncSession = Depends(get_db),
@@ -33,48 +80,58 @@ async def review_flashcard_with_session(
     if quality < 0 or quality > 5:
         raise HTTPException(status_code=400, detail="Quality must be between 0 and 5")
 
+    flashcard = await record_review(db, user_id, session_id, flashcard_id, quality)
+    return to_flashcard_response(flashcard)
+
+# Applies a whole session's reviews at once: one SELECT for the cards, the scheduler
+# updates as vectorized passes, then a single UPDATE and INSERT in one transaction
+@router.post("/review-sessions/{session_id}/reviews", response_model=ReviewBatchResult)
+async def submit_review_batch(
+    session_id: str,
+    payload: ReviewBatch,
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user),
+):
     session_check = await db.execute(
-        select(ReviewSession).where(ReviewSession.id == session_id, ReviewSession.user_id == user_id)
+        select(ReviewSession.id).where(ReviewSession.id == session_id, ReviewSession.user_id == user_id)
     )
-    session = session_check.scalar_one_or_none()
-    if not session:
+    if session_check.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Invalid or expired review session.")
 
+    scheduler = await get_user_scheduler(db, user_id)
+    flashcard_ids = list(dict.fromkeys(r.flashcard_id for r in payload.reviews))
+    # Row locks keep a concurrent single review from being overwritten by this batch
     result = await db.execute(
-        select(Flashcard).where(Flashcard.id == flashcard_id, Flashcard.user_id == user_id)
-    )
-    flashcard = result.scalar_one_or_none()
-    if not flashcard:
-        raise HTTPException(status_code=404, detail="Flashcard not found")
-
-    if quality < 3:
-        flashcard.interval = 1
-        flashcard.review_count = 0
-    else:
-        flashcard.review_count += 1
-        if flashcard.review_count == 1:
-            flashcard.interval = 1
-        elif flashcard.review_count == 2:
-            flashcard.interval = 6
-        else:
-            flashcard.interval = int(flashcard.interval * flashcard.ease_factor)
-        flashcard.ease_factor = max(1.3, flashcard.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
-
-    flashcard.last_reviewed = date.today()
-    flashcard.next_review_date = flashcard.last_reviewed + timedelta(days=flashcard.interval)
-
-    review_event = ReviewEvent(
-        id=str(uuid.uuid4()),
-        session_id=session.id,
-        user_id=user_id,
-        flashcard_id=flashcard.id,
-        rating=quality
+        select(Flashcard.id, *(getattr(Flashcard, column) for column in STATE_COLUMNS))
+        .where(Flashcard.id.in_(flashcard_ids), Flashcard.user_id == user_id)
+        .with_for_update()
     )
-    db.add(review_event)
+    states = {row.id: row._mapping for row in result}
+    missing = [i for i in flashcard_ids if i not in states]
+    if missing:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail={"message": "Flashcards not found", "flashcard_ids": missing})
 
+    schedules = schedule_reviews(scheduler, states, [(r.flashcard_id, r.quality) for r in payload.reviews])
+    now = datetime.utcnow()
+    await db.execute(update(Flashcard), [{"id": i, **schedule} for i, schedule in schedules.items()])
+    await db.execute(insert(ReviewEvent), [
+        {
+            "id": str(uuid.uuid4()),
+            "session_id": session_id,
+            "user_id": user_id,
+            "flashcard_id": r.flashcard_id,
+            "rating": r.quality,
+            "created_at": now,
+        }
+        for r in payload.reviews
+    ])
     await db.commit()
-    await db.refresh(flashcard)
-    return to_flashcard_response(flashcard)
+
+    return {
+        "reviewed": len(payload.reviews),
+        "flashcards": [{"id": i, "spaced_repetition": schedule} for i, schedule in schedules.items()],
+    }
 
 @router.get("/review-sessions/{session_id}/summary")
 async def get_review_session_summary(
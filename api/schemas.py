@@ -20,11 +20,47 @@ class FlashcardData(BaseModel):
 class FlashcardFolderUpdate(BaseModel):
     folder_id: str | None  # allow null to remove from folder
 
+# Cards a bulk operation applies to: explicit ids and/or filters, combined with AND
+class FlashcardSelection(BaseModel):
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=5000)
+    folder_id: Optional[str] = None
+    unfiled: bool = False  # only cards without a folder
+    source_lang: Optional[str] = None
+    target_lang: Optional[str] = None
+    pos: Optional[str] = None
+    due: Optional[bool] = None  # True: due today or earlier; False: not due
+    all: bool = False  # required to select every card when no other criterion is given
+
+class FlashcardBulkMove(BaseModel):
+    selection: FlashcardSelection
+    folder_id: str | None  # allow null to remove from folder
+
+class FlashcardBulkDelete(BaseModel):
+    selection: FlashcardSelection
+    # Also delete the cards' review and quiz history, which otherwise is kept unlinked
+    purge_history: bool = False
+
+class FlashcardBulkUpdate(BaseModel):
+    selection: FlashcardSelection
+    pos: Optional[str] = Field(None, max_length=50)
+    source_lang: Optional[str] = None
+    target_lang: Optional[str] = None
+
+class BulkOperationResult(BaseModel):
+    affected: int
+
 class FlashcardCreate(BaseModel):
     word: str
     folder_id: Optional[str] = None
     source_lang: str = "en"
     target_lang: str = "zh"
+    enrich: bool = False  # force GPT example/notes even when the dictionary covers the word
+
+class FlashcardBatchCreate(BaseModel):
+    words: List[str]
+    source_lang: str = "en"
+    target_lang: str = "zh"
+    enrich: bool = False
 
 class FlashcardSubmit(BaseModel):
     word: str
@@ -37,6 +73,13 @@ class FlashcardSubmit(BaseModel):
     target_lang: str = "zh"
     folder_id: Optional[str] = None
 
+# FlashcardSubmit for one imported row; only word and translation are required
+class FlashcardImportRow(FlashcardSubmit):
+    phonetic: str = ""
+    pos: str = ""
+    example: str = ""
+    notes: str = ""
+
 class SpacedRepetitionMetadata(BaseModel):
     review_count: int
     interval: int
@@ -67,6 +110,7 @@ class FlashcardPreview(BaseModel):
     notes: str
     source_lang: str
     target_lang: str
+    traditional: Optional[str] = None
 
 class FlashcardUpdate(BaseModel):
     word: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -96,8 +140,29 @@ class FlashcardResponse(BaseModel):
         orm_mode = True # tells pydantic to accept SQLAlchemy as input
 
 class PaginatedFlashcardResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
     flashcards: List[FlashcardResponse]
+    next_cursor: Optional[str] = None
+
+class FlashcardSearchResponse(BaseModel):
+    flashcards: List[FlashcardResponse]
+    next_offset: Optional[int] = None
+
+class ReviewSubmission(BaseModel):
+    flashcard_id: str
+    quality: int = Field(..., ge=0, le=5)
+
+# A review session recorded offline, in the order the cards were rated
+class ReviewBatch(BaseModel):
+    reviews: List[ReviewSubmission] = Field(..., min_length=1, max_length=1000)
+
+class ReviewedFlashcard(BaseModel):
+    id: str
+    spaced_repetition: SpacedRepetitionMetadata
+
+class ReviewBatchResult(BaseModel):
+    reviewed: int  # review events recorded
+    flashcards: List[ReviewedFlashcard]  # final schedule of each distinct card
 
 class FolderCreate(BaseModel):
     name: str
@@ -146,6 +211,14 @@ class ReviewRetentionPoint(BaseModel):
     date: str
     rate: float
 
+class ReviewForecastDay(BaseModel):
+    date: str
+    count: int
+
+class ReviewForecastResponse(BaseModel):
+    days: List[ReviewForecastDay]  # today first; today includes overdue cards
+    total: int
+
 class IntervalBin(BaseModel):
     interval: str
     count: int
@@ -180,6 +253,10 @@ class UserSettingsResponse(BaseModel):
     dark_mode: bool
     daily_learning_goal: int
     onboarding_completed: bool = False
+    scheduler: Optional[str] = "sm2"
+    desired_retention: Optional[float] = 0.9
+    fsrs_params: Optional[List[float]] = None
+    load_balance: Optional[bool] = False
 
     class Config:
         orm_mode = True
@@ -193,6 +270,9 @@ class UserSettingsUpdate(BaseModel):
     dark_mode: Optional[bool]
     daily_learning_goal: Optional[int]
     onboarding_completed: Optional[bool]
+    scheduler: Optional[str] = Field(None, pattern="^(sm2|fsrs)$")
+    desired_retention: Optional[float] = Field(None, ge=0.7, le=0.97)
+    load_balance: Optional[bool] = None
 
 class FlashcardReviewPreview(BaseModel):
     id: str
@@ -6,6 +6,7 @@ from database.database import get_db
 from auth.dependencies import get_current_user
 from models.settings import UserSettings
 from api.schemas import UserSettingsResponse, UserSettingsUpdate
+from utils.scheduler import invalidate_user_scheduler
 
 router = APIRouter()
 
@@ -50,5 +51,6 @@ async def update_user_settings(
         setattr(settings, key, value)
 
     await db.commit()
+    invalidate_user_scheduler(user_id)
     await db.refresh(settings)
     return settings
\ No newline at end of file
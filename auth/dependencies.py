@@ -1,9 +1,10 @@
-from fastapi import HTTPException, Header
+from fastapi import HTTPException, Header, Depends
 from jose import JWTError, jwt
 import os
 
 SECRET_KEY = os.getenv("NEXTAUTH_SECRET")
 ALGORITHM = "HS256"
+ADMIN_USER_IDS = {uid.strip() for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()}
 
 async def get_current_user(authorization: str = Header(...)) -> str:
     if not authorization.startswith("Bearer "):
@@ -17,4 +18,9 @@ async def get_current_user(authorization: str = Header(...)) -> str:
             raise HTTPException(status_code=401, detail="Token missing user ID")
         return user_id
     except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+async def get_admin_user(user_id: str = Depends(get_current_user)) -> str:
+    if user_id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user_id
@@ -7,6 +7,13 @@ from api.stats import router as stats_router
 from api.settings import router as settings_router
 from api.review import router as review_router
 from api.account import router as account_router
+from api.admin import router as admin_router
+from api.dictionary import router as dictionary_router
+from api.export import router as export_router
+from api.bulk import router as bulk_router
+from utils.gpt import gpt_pool
+from utils.cedict import load_cedict
+from utils.semantic import load_semantic_index
 
 app = FastAPI()
 
@@ -20,6 +27,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor for the next page of GET /flashcards/review
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Route registration
@@ -29,4 +38,17 @@ app.include_router(quiz_router)
 app.include_router(stats_router)
 app.include_router(settings_router)
 app.include_router(review_router)
-app.include_router(account_router)
\ No newline at end of file
+app.include_router(account_router)
+app.include_router(admin_router)
+app.include_router(dictionary_router)
+app.include_router(export_router)
+app.include_router(bulk_router)
+
+@app.on_event("startup")
+async def load_dictionary():
+    load_cedict()
+    load_semantic_index()
+
+@app.on_event("shutdown")
+async def close_gpt_pool():
+    await gpt_pool.aclose()
@@ -5,6 +5,7 @@ from .flashcard import Flashcard
 from .quiz import QuizSession, QuizAnswerLog
 from .settings import UserSettings
 from .review import ReviewEvent, ReviewSession
+from .generated_content import GeneratedContent
 
 __all__ = [
     "Base",
@@ -15,5 +16,6 @@ __all__ = [
     "QuizAnswerLog",
     "UserSettings",
     "ReviewEvent",
-    "ReviewSession"
+    "ReviewSession",
+    "GeneratedContent"
 ]
\ No newline at end of file
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, Float, Date
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, Float, Date, Index, func, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base  # SQLAlchemy declarative_base
 
 class Flashcard(Base):
     __tablename__ = "Flashcard"
+    __table_args__ = (
+        # Keyset pagination of GET /flashcards: newest first, id breaks ties
+        Index("ix_flashcard_user_created", "user_id", "created_at", "id"),
+        # Due queue, due count and upcoming-review preview, keyset paged by id
+        Index("ix_flashcard_user_due", "user_id", "next_review_date", "id"),
+        # Review forecast across all users (GET /admin/review-forecast), as an index-only scan
+        Index("ix_flashcard_due", "next_review_date"),
+    )
 
     # Core flashcard content
     id = Column(String, primary_key=True, index=True)
@@ -14,6 +22,8 @@ class Flashcard(Base):
     pos = Column(String)
     example = Column(Text)
     notes = Column(Text)
+    # Normalized word/translation/notes/example plus toneless pinyin (see utils.search)
+    search_text = Column(Text)
 
     # Language metadata
     source_lang = Column(String, nullable=False, default="en")
@@ -26,6 +36,10 @@ class Flashcard(Base):
     ease_factor = Column(Float, default=2.5)  # SM-2 default ease factor
     interval = Column(Integer, default=0)     # Days until next review
 
+    # FSRS memory state (utils.fsrs); NULL until the card is reviewed under FSRS
+    stability = Column(Float, nullable=True)   # Days until recall probability drops to 90%
+    difficulty = Column(Float, nullable=True)  # 1 (easy) to 10 (hard)
+
     # Ownership and structure
     created_at = Column(DateTime, default=datetime.utcnow)
     user_id = Column(String, ForeignKey("User.id"), nullable=False)
@@ -33,4 +47,18 @@ class Flashcard(Base):
 
     # Relationships
     folder = relationship("Folder", back_populates="flashcards")
-    user = relationship("User", back_populates="flashcards")
\ No newline at end of file
+    user = relationship("User", back_populates="flashcards")
+
+
+def search_vector(column):
+    # 'simple' config: no stemming or stop words, so pinyin and CJK runs index as-is
+    return func.to_tsvector(text("'simple'"), column)
+
+
+def search_tsquery(value):
+    return func.plainto_tsquery(text("'simple'"), value)
+
+
+# Search indexes (pg_trgm must be installed; see scripts/db_indexes.py)
+Index("ix_flashcard_search_trgm", Flashcard.search_text, postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"})
+Index("ix_flashcard_search_tsv", search_vector(Flashcard.search_text), postgresql_using="gin")
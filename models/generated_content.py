@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, Text
+from datetime import datetime
+from .base import Base
+
+# Shared (not per-user) GPT output, keyed by the normalized lookup
+class GeneratedContent(Base):
+    __tablename__ = "GeneratedContent"
+
+    word = Column(String, primary_key=True)
+    source_lang = Column(String, primary_key=True)
+    target_lang = Column(String, primary_key=True)
+
+    translation = Column(String, nullable=False)
+    example = Column(Text)
+    notes = Column(Text)
+    pos = Column(String)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
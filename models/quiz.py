@@ -30,7 +30,8 @@ class QuizAnswerLog(Base):
 
     id = Column(String, primary_key=True, index=True)
     session_id = Column(String, ForeignKey("QuizSession.id"), nullable=False)
-    flashcard_id = Column(String, ForeignKey("Flashcard.id"), nullable=False)
+    # Kept when the card is deleted so quiz accuracy survives; the link is cleared
+    flashcard_id = Column(String, ForeignKey("Flashcard.id", ondelete="SET NULL"), nullable=True)
     is_correct = Column(Boolean, default=False)
     answered_at = Column(DateTime, default=datetime.utcnow)
 
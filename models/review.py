@@ -20,7 +20,8 @@ class ReviewEvent(Base):
     id = Column(String, primary_key=True, index=True)
     session_id = Column(String, ForeignKey("ReviewSession.id"), nullable=False)
     user_id = Column(String, ForeignKey("User.id"), nullable=False)
-    flashcard_id = Column(String, ForeignKey("Flashcard.id"), nullable=False)
+    # Kept when the card is deleted so stats and history survive; the link is cleared
+    flashcard_id = Column(String, ForeignKey("Flashcard.id", ondelete="SET NULL"), nullable=True)
     rating = Column(SmallInteger, nullable=False)  # 0–5 scale
     created_at = Column(DateTime, default=datetime.utcnow)
 
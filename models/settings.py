@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, Float, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -16,4 +16,10 @@ class UserSettings(Base):
     dark_mode = Column(Boolean, default=False)
     onboarding_completed = Column(Boolean, default=False)
 
+    # Review scheduling: "sm2" or "fsrs" (utils.scheduler)
+    scheduler = Column(String, default="sm2")
+    desired_retention = Column(Float, default=0.9)  # FSRS target recall probability
+    fsrs_params = Column(JSON, nullable=True)  # fitted by scripts/fit_fsrs.py; NULL uses the defaults
+    load_balance = Column(Boolean, default=False)  # fuzz new intervals to flatten daily review peaks
+
     user = relationship("User")
\ No newline at end of file
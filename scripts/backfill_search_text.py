@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import text, update
+from sqlalchemy.future import select
+from database.database import engine, AsyncSessionLocal
+from models import Flashcard
+from utils.cedict import load_cedict
+from utils.search import build_search_text
+
+# Adds Flashcard.search_text to an existing database and fills it in primary-key order,
+# one batch per transaction. Run scripts/db_indexes.py afterwards for the search indexes.
+async def backfill_search_text(batch_size=1000, rebuild=False):
+    # Traditional -> simplified folding needs the dictionary; without it every Chinese
+    # card would be written unfolded, with nothing to mark it for a later rebuild
+    if load_cedict() is None:
+        raise SystemExit("CEDICT is required for search_text; build data/cedict.idx with scripts/parse_cedict.py first")
+
+    async with engine.begin() as conn:
+        await conn.execute(text('ALTER TABLE "Flashcard" ADD COLUMN IF NOT EXISTS search_text TEXT'))
+
+    columns = [Flashcard.id, Flashcard.word, Flashcard.translation, Flashcard.phonetic, Flashcard.notes, Flashcard.example]
+    last_id, updated = "", 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            query = select(*columns).where(Flashcard.id > last_id).order_by(Flashcard.id).limit(batch_size)
+            if not rebuild:
+                query = query.where(Flashcard.search_text.is_(None))
+            result = await db.execute(query)
+            rows = result.all()
+            if not rows:
+                break
+
+            await db.execute(update(Flashcard), [
+                {"id": r.id, "search_text": build_search_text(r.word, r.translation, r.phonetic, r.notes, r.example)}
+                for r in rows
+            ])
+            await db.commit()
+            last_id = rows[-1].id
+            updated += len(rows)
+            print(f"Updated {updated} flashcards")
+
+    return updated
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill Flashcard.search_text for existing cards.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--rebuild", action="store_true", help="recompute every card, not only missing ones")
+    args = parser.parse_args()
+    asyncio.run(backfill_search_text(args.batch_size, args.rebuild))
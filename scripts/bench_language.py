@@ -0,0 +1,62 @@
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from langdetect import detect_langs
+from utils.language import _detect, detect_language
+
+# Mix of the app's languages, weighted towards short single-word previews
+SAMPLE_WORDS = [
+    "吃", "你好", "学习", "电脑", "朋友", "图书馆", "我喜欢喝茶", "飞机场",
+    "eat", "hello", "apple", "run", "computer", "water", "good morning", "to learn",
+    "école", "garçon", "très bien", "fenêtre", "bonjour", "maison", "je mange une pomme", "où est la gare",
+]
+
+# The previous utils.detect_language, kept here as the baseline
+def legacy_detect_language(text, threshold=0.8):
+    try:
+        langs = detect_langs(text)
+        if langs:
+            top_lang = langs[0]
+            if top_lang.prob >= threshold:
+                return top_lang.lang
+    except Exception:
+        pass
+    if re.search(r'[\u4e00-\u9fff]', text):
+        return "zh"
+    return "unknown"
+
+def throughput(fn, words, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for word in words:
+            fn(word)
+    elapsed = time.perf_counter() - start
+    return rounds * len(words) / elapsed
+
+def unstable_words(fn, words, repeats):
+    return [word for word in words if len(Counter(fn(word) for _ in range(repeats))) > 1]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare language detection throughput and stability.")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20, help="calls per word when checking determinism")
+    args = parser.parse_args()
+
+    legacy = throughput(legacy_detect_language, SAMPLE_WORDS, args.rounds)
+    _detect.cache_clear()
+    cold = throughput(detect_language, SAMPLE_WORDS, 1)
+    warm = throughput(detect_language, SAMPLE_WORDS, args.rounds)
+
+    print(f"legacy detect_langs:  {legacy:>12,.0f} calls/s")
+    print(f"detector, cold cache: {cold:>12,.0f} calls/s ({cold / legacy:.1f}x)")
+    print(f"detector, warm cache: {warm:>12,.0f} calls/s ({warm / legacy:.1f}x)")
+
+    _detect.cache_clear()
+    print(f"legacy unstable words:   {unstable_words(legacy_detect_language, SAMPLE_WORDS, args.repeats)}")
+    print(f"detector unstable words: {unstable_words(lambda w: _detect.__wrapped__(w, 0.8), SAMPLE_WORDS, args.repeats)}")
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+from models import Flashcard
+from api.flashcards import to_flashcard_response
+from api.schemas import FlashcardResponse
+from utils.projection import parse_fields, projection_columns, row_serializer
+from utils.responses import encode_value
+
+# Compares the per-row cost of the ORM + response-model path with the projected
+# Core-row path, end to end from query to JSON bytes. Uses in-memory SQLite so no
+# database is needed; driver costs differ from asyncpg but both paths pay them.
+
+def make_rows(count):
+    today = date.today()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "word": f"词{i}",
+            "translation": f"word {i}",
+            "phonetic": "ci2",
+            "pos": "noun",
+            "example": "这是一个例子。",
+            "notes": "",
+            "source_lang": "zh",
+            "target_lang": "en",
+            "user_id": "bench-user",
+            "folder_id": None,
+            "created_at": datetime.utcnow(),
+            "review_count": i % 7,
+            "interval": i % 30,
+            "ease_factor": 2.5,
+            "last_reviewed": today - timedelta(days=i % 30),
+            "next_review_date": today + timedelta(days=i % 30),
+        }
+        for i in range(count)
+    ]
+
+def orm_path(engine, adapter):
+    with Session(engine) as session:
+        cards = session.execute(select(Flashcard).where(Flashcard.user_id == "bench-user")).scalars().all()
+        responses = [to_flashcard_response(card) for card in cards]
+        # What FastAPI does with response_model: validate, dump to JSON-able data, encode
+        content = adapter.dump_python(adapter.validate_python(responses), mode="json")
+        return json.dumps(content).encode("utf-8")
+
+def projected_path(engine, fields):
+    serialize = row_serializer(fields)
+    with Session(engine) as session:
+        rows = session.execute(select(*projection_columns(fields)).where(Flashcard.user_id == "bench-user")).all()
+        content = [serialize(row) for row in rows]
+        return json.dumps(content, default=encode_value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def per_row_microseconds(fn, rows, rounds):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds / rows * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list-endpoint serialization per row.")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(CreateTable(Flashcard.__table__))
+        conn.execute(insert(Flashcard.__table__), make_rows(args.rows))
+
+    adapter = TypeAdapter(List[FlashcardResponse])
+    before = per_row_microseconds(lambda: orm_path(engine, adapter), args.rows, args.rounds)
+    print(f"ORM entities + FlashcardResponse:       {before:8.1f} us/row")
+    for spec in (None, "id,word,translation,phonetic,pos", "id,word"):
+        after = per_row_microseconds(lambda: projected_path(engine, parse_fields(spec)), args.rows, args.rounds)
+        print(f"projected rows, fields={spec or 'all':<26} {after:8.1f} us/row ({before / after:.1f}x)")
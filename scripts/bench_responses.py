@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from api.schemas import FlashcardResponse, FlashcardSearchResponse, PaginatedFlashcardResponse
+from utils.responses import ResponseEncoder, dumps_json, msgpack, orjson, type_adapter
+
+# Compares response encoding for the api/schemas.py list models: FastAPI's default
+# response_model path against the precompiled pydantic serializer, orjson over plain
+# rows, and MessagePack. No database needed; the payloads are built in memory. The
+# server uses the JSON fast paths only with FAST_RESPONSES=1; this script always times them.
+
+def make_card(i):
+    today = date.today()
+    return {
+        "id": str(uuid.uuid4()),
+        "word": f"词{i}",
+        "translation": f"word {i}",
+        "phonetic": "cí",
+        "pos": "noun",
+        "example": "这是一个例子。",
+        "notes": "",
+        "source_lang": "zh",
+        "target_lang": "en",
+        "user_id": "bench-user",
+        "created_at": datetime.utcnow(),
+        "folder_id": None,
+        "spaced_repetition": {
+            "review_count": i % 7,
+            "interval": i % 30,
+            "ease_factor": 2.5,
+            "last_reviewed": today - timedelta(days=i % 30),
+            "next_review_date": today + timedelta(days=i % 30),
+        },
+    }
+
+# What FastAPI does with response_model: validate, dump to JSON-able data, json.dumps
+def default_path(model, content):
+    adapter = type_adapter(model)
+    data = adapter.dump_python(adapter.validate_python(content), mode="json")
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def per_row_microseconds(fn, rows, rounds):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds / rows * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response encoding per row for the list schemas.")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = [make_card(i) for i in range(args.rows)]
+    cards = [FlashcardResponse(**row) for row in rows]
+    payloads = {
+        PaginatedFlashcardResponse: (
+            {"total": args.rows, "flashcards": rows, "next_cursor": None},
+            PaginatedFlashcardResponse(total=args.rows, flashcards=cards),
+        ),
+        FlashcardSearchResponse: (
+            {"flashcards": rows, "next_offset": None},
+            FlashcardSearchResponse(flashcards=cards),
+        ),
+    }
+    json_encoder, msgpack_encoder = ResponseEncoder(fast=True), ResponseEncoder(use_msgpack=True)
+    print(f"orjson: {'installed' if orjson else 'missing'}, msgpack: {'installed' if msgpack else 'missing'}")
+
+    for model, (plain, instance) in payloads.items():
+        print(model.__name__)
+        before = per_row_microseconds(lambda: default_path(model, plain), args.rows, args.rounds)
+        print(f"  response_model + json.dumps:   {before:8.2f} us/row")
+        timings = {
+            "TypeAdapter.dump_json":        lambda: json_encoder.response(instance, model).body,
+            "stdlib json over dict rows":   lambda: dumps_json(plain),
+            "orjson over dict rows":        lambda: dumps_json(plain, fast=True),
+        }
+        if msgpack is not None:
+            timings["msgpack over dict rows"] = lambda: msgpack_encoder.response(plain).body
+            timings["msgpack from model"] = lambda: msgpack_encoder.response(instance, model).body
+        for label, fn in timings.items():
+            after = per_row_microseconds(fn, args.rows, args.rounds)
+            print(f"  {label + ':':<30} {after:8.2f} us/row ({before / after:.1f}x)")
+
+        # The fast paths must decode to what the default path sends
+        expected = json.loads(default_path(model, plain))
+        assert json.loads(dumps_json(plain)) == expected
+        assert json.loads(dumps_json(plain, fast=True)) == expected
+        assert json.loads(json_encoder.response(instance, model).body) == expected
@@ -0,0 +1,26 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from scripts.parse_cedict import iter_cedict_lines, iter_cedict_entries, iter_jsonl
+from utils.cedict_index import build_cedict_index, CedictIndex
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(__file__)
+    parser = argparse.ArgumentParser(description="Compile CC-CEDICT (.gz release or parsed .jsonl) into the mmap lookup index.")
+    parser.add_argument("--source", default=os.path.join(base_dir, "../data/cedict_1_0_ts_utf-8_mdbg.txt.gz"))
+    parser.add_argument("--output", default=os.path.join(base_dir, "../data/cedict.idx"))
+    args = parser.parse_args()
+
+    if args.source.endswith(".jsonl"):
+        entries = iter_jsonl(args.source)
+    else:
+        entries = iter_cedict_entries(iter_cedict_lines(args.source))
+    count = build_cedict_index(entries, args.output)
+
+    index = CedictIndex(args.output)
+    print(f"Wrote {count} headwords ({os.path.getsize(args.output)} bytes) to {args.output}")
+    print(index.prefix("你", limit=3))
+    index.close()
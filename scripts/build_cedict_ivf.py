@@ -0,0 +1,23 @@
+import argparse
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.semantic import build_ivf
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(__file__)
+    parser = argparse.ArgumentParser(description="Build the approximate (IVF) index over the CEDICT embeddings.")
+    parser.add_argument("--embeddings", default=os.path.join(base_dir, "../data/cedict_embeddings.npy"))
+    parser.add_argument("--output", default=os.path.join(base_dir, "../data/cedict_embeddings.ivf.npz"))
+    parser.add_argument("--lists", type=int, default=0, help="number of clusters (default: sqrt(rows))")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    matrix = np.load(args.embeddings, mmap_mode="r")
+    n_lists = args.lists or max(1, int(np.sqrt(len(matrix))))
+    centroids, order, offsets = build_ivf(matrix, n_lists, iterations=args.iterations)
+    np.savez(args.output, centroids=centroids, order=order, offsets=offsets)
+    print(f"Wrote {n_lists} lists over {len(matrix)} rows to {args.output}")
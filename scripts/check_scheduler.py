@@ -0,0 +1,58 @@
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from utils.scheduler import RELEARNING_INTERVAL, FSRSScheduler, SM2Scheduler, schedule_reviews, sm2, sm2_many
+
+# Sanity checks for the review schedulers; no database needed. Run after changing
+# utils/scheduler.py or utils/fsrs.py:
+#   python scripts/check_scheduler.py
+
+TODAY = date(2026, 1, 1)
+
+
+def mature_card(interval: int, stability=None) -> dict:
+    return {
+        "review_count": 8,
+        "interval": interval,
+        "ease_factor": 2.5,
+        "stability": stability,
+        "difficulty": None if stability is None else 5.0,
+        "last_reviewed": TODAY - timedelta(days=interval),
+    }
+
+
+def check_lapse_relearned():
+    # A failed review of a 100-day card comes back the next day, with or without FSRS state
+    for scheduler in (SM2Scheduler(), FSRSScheduler(), FSRSScheduler(load_balance=True)):
+        for stability in (None, 100.0):
+            for quality in (0, 1, 2):
+                state = schedule_reviews(scheduler, {"c": mature_card(100, stability)}, [("c", quality)], TODAY)["c"]
+                assert state["interval"] <= RELEARNING_INTERVAL, (type(scheduler).__name__, stability, quality, state)
+                assert state["next_review_date"] <= TODAY + timedelta(days=1)
+
+
+def check_mature_card_kept():
+    # A "good" on a mature SM-2 card that has no FSRS state yet keeps a long interval
+    state = schedule_reviews(FSRSScheduler(), {"c": mature_card(120)}, [("c", 4)], TODAY)["c"]
+    assert state["interval"] >= 120, state
+
+
+def check_sm2_batch_matches_scalar():
+    rng = np.random.default_rng(0)
+    count = rng.integers(0, 10, 5000)
+    interval = rng.integers(0, 400, 5000)
+    ease = rng.uniform(1.3, 3.0, 5000)
+    quality = rng.integers(0, 6, 5000)
+    batch = list(zip(*(a.tolist() for a in sm2_many(count, interval, ease, quality))))
+    scalar = [sm2(*args) for args in zip(count.tolist(), interval.tolist(), ease.tolist(), quality.tolist())]
+    assert batch == scalar
+
+
+if __name__ == "__main__":
+    for check in (check_lapse_relearned, check_mature_card_kept, check_sm2_batch_matches_scalar):
+        check()
+        print(f"ok  {check.__name__}")
@@ -0,0 +1,31 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateColumn
+from database.database import engine
+from models import Flashcard, UserSettings
+
+# create_all never alters existing tables, so databases created before these columns
+# were declared need this to pick them up. All are nullable; code treats NULL as the default.
+ADDED_COLUMNS = [
+    Flashcard.__table__.c.stability,
+    Flashcard.__table__.c.difficulty,
+    UserSettings.__table__.c.scheduler,
+    UserSettings.__table__.c.desired_retention,
+    UserSettings.__table__.c.fsrs_params,
+    UserSettings.__table__.c.load_balance,
+]
+
+async def add_missing_columns():
+    async with engine.begin() as conn:
+        for column in ADDED_COLUMNS:
+            definition = CreateColumn(column).compile(dialect=conn.dialect)
+            await conn.execute(text(f'ALTER TABLE "{column.table.name}" ADD COLUMN IF NOT EXISTS {definition}'))
+            print(f"Ensured {column.table.name}.{column.name}")
+
+if __name__ == "__main__":
+    asyncio.run(add_missing_columns())
@@ -6,7 +6,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from sqlalchemy import text
 from database.database import engine
-from models import Folder, Flashcard, QuizSession, QuizAnswerLog, UserSettings, ReviewEvent, ReviewSession
+from models import Folder, Flashcard, QuizSession, QuizAnswerLog, UserSettings, ReviewEvent, ReviewSession, GeneratedContent
 from models.base import Base
 
 async def drop_app_models():
@@ -21,6 +21,7 @@ async def drop_app_models():
                 UserSettings.__table__,
                 ReviewSession.__table__,
                 ReviewEvent.__table__,
+                GeneratedContent.__table__,
             ]
         ))
 
@@ -0,0 +1,40 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import text
+from database.database import engine
+from models import QuizAnswerLog, ReviewEvent
+
+# create_all never alters existing constraints, so databases created before history
+# rows outlived their cards still have NOT NULL foreign keys without ON DELETE; this
+# recreates them as declared on the models (nullable, ON DELETE SET NULL)
+CHANGED_FOREIGN_KEYS = [
+    ReviewEvent.__table__.c.flashcard_id,
+    QuizAnswerLog.__table__.c.flashcard_id,
+]
+
+async def update_foreign_keys():
+    async with engine.begin() as conn:
+        for column in CHANGED_FOREIGN_KEYS:
+            table = column.table.name
+            (foreign_key,) = column.foreign_keys
+            target = foreign_key.column
+            existing = await conn.execute(text("""
+                SELECT c.conname FROM pg_constraint c
+                JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+                WHERE c.conrelid = CAST(:table AS regclass) AND c.contype = 'f' AND a.attname = :column
+            """), {"table": f'"{table}"', "column": column.name})
+            for (name,) in existing.all():
+                await conn.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{name}"'))
+            await conn.execute(text(f'ALTER TABLE "{table}" ALTER COLUMN {column.name} DROP NOT NULL'))
+            await conn.execute(text(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_{column.name}_fkey" FOREIGN KEY ({column.name}) '
+                f'REFERENCES "{target.table.name}" ({target.name}) ON DELETE {foreign_key.ondelete}'
+            ))
+            print(f"Updated {table}.{column.name} -> {target.table.name}.{target.name} ON DELETE {foreign_key.ondelete}")
+
+if __name__ == "__main__":
+    asyncio.run(update_foreign_keys())
@@ -0,0 +1,26 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import text
+from database.database import engine
+from models import Flashcard
+
+# create_all only creates indexes together with their tables, so databases created
+# before an index was declared need this to pick it up
+INDEXED_TABLES = [
+    Flashcard.__table__,
+]
+
+async def create_missing_indexes():
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                await conn.run_sync(lambda sync_conn: index.create(bind=sync_conn, checkfirst=True))
+                print(f"Ensured {index.name} on {table.name}")
+
+if __name__ == "__main__":
+    asyncio.run(create_missing_indexes())
@@ -4,12 +4,15 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+from sqlalchemy import text
 from database.database import engine
-from models import Folder, Flashcard, QuizSession, QuizAnswerLog, UserSettings, ReviewEvent, ReviewSession
+from models import Folder, Flashcard, QuizSession, QuizAnswerLog, UserSettings, ReviewEvent, ReviewSession, GeneratedContent
 from models.base import Base
 
 async def init_app_models():
     async with engine.begin() as conn:
+        # Flashcard search uses a trigram index
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(lambda sync_conn: Base.metadata.create_all(
             bind=sync_conn,
             tables=[
@@ -20,6 +23,7 @@ async def init_app_models():
                 UserSettings.__table__,
                 ReviewSession.__table__,
                 ReviewEvent.__table__,
+                GeneratedContent.__table__,
             ]
         ))
 
@@ -1,40 +1,129 @@
+import argparse
+import hashlib
 import json
 import os
-import pickle
+import shutil
+import sys
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
-def load_cedict_json(path):
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from scripts.parse_cedict import iter_jsonl
+
+# Row i of the embedding matrix describes row i of the metadata table
+METADATA_COLUMNS = ("simplified", "traditional", "pinyin", "definition")
+
+def load_cedict_entries(path):
+    if path.endswith(".jsonl"):
+        yield from iter_jsonl(path)
+        return
     with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        for defs in json.load(f).values():
+            yield from defs
+
+def write_metadata(entries, path):
+    texts = []
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\t".join(METADATA_COLUMNS) + "\n")
+        for entry in entries:
+            definition_text = " / ".join(entry["definitions"]).replace("\t", " ")
+            f.write(f"{entry['simplified']}\t{entry['traditional']}\t{entry['pinyin']}\t{definition_text}\n")
+            texts.append(definition_text)
+    os.replace(tmp_path, path)
+    return texts
+
+def encode_chunk(model, texts, batch_size, pool=None):
+    if pool is not None:
+        embeddings = model.encode_multi_process(texts, pool, batch_size=batch_size)
+    else:
+        embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    # Stored unit-length so cosine similarity is a plain dot product
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return (embeddings / np.maximum(norms, 1e-12)).astype(np.float16)
 
-def embed_definitions(cedict_data, model_name="all-MiniLM-L6-v2"):
+def prepare_checkpoint_dir(checkpoint_dir, manifest):
+    # Chunks from a run with a different source, model or chunking can't be reused
+    manifest_path = os.path.join(checkpoint_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            if json.load(f) == manifest:
+                return
+        shutil.rmtree(checkpoint_dir)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+# Fingerprint of the definitions in order, so a new CEDICT release never reuses old chunks
+def texts_digest(texts):
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+def embed_definitions(texts, checkpoint_dir, model_name="all-MiniLM-L6-v2", batch_size=256, chunk_size=8192, processes=1):
+    prepare_checkpoint_dir(checkpoint_dir, {
+        "rows": len(texts),
+        "sha256": texts_digest(texts),
+        "model": model_name,
+        "chunk_size": chunk_size,
+    })
     model = SentenceTransformer(model_name)
-    entries = []
-
-    for simplified, defs in cedict_data.items():
-        for entry in defs:
-            definition_text = " / ".join(entry["definitions"])
-            embedding = model.encode(definition_text)
-            entries.append({
-                "simplified": simplified,
-                "traditional": entry["traditional"],
-                "pinyin": entry["pinyin"],
-                "definition": definition_text,
-                "embedding": embedding
-            })
-
-    return entries
-
-def save_embeddings(entries, path):
-    with open(path, "wb") as f:
-        pickle.dump(entries, f)
+    pool = model.start_multi_process_pool(target_devices=["cpu"] * processes) if processes > 1 else None
+
+    chunk_paths = []
+    try:
+        for chunk_number, start in enumerate(range(0, len(texts), chunk_size)):
+            chunk_path = os.path.join(checkpoint_dir, f"chunk_{chunk_number:05d}.npy")
+            chunk_paths.append(chunk_path)
+            if os.path.exists(chunk_path):
+                continue  # resumed from an earlier run
+            embeddings = encode_chunk(model, texts[start:start + chunk_size], batch_size, pool)
+            np.save(chunk_path + ".tmp.npy", embeddings)
+            os.replace(chunk_path + ".tmp.npy", chunk_path)
+            print(f"Encoded rows {start}-{start + len(embeddings)} of {len(texts)}")
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+
+    return chunk_paths, model.get_sentence_embedding_dimension()
+
+def save_embeddings(chunk_paths, rows, dim, path):
+    tmp_path = path + ".tmp.npy"
+    matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float16, shape=(rows, dim))
+    offset = 0
+    for chunk_path in chunk_paths:
+        chunk = np.load(chunk_path, mmap_mode="r")
+        matrix[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+    matrix.flush()
+    del matrix
+    os.replace(tmp_path, path)
 
 if __name__ == "__main__":
     base_dir = os.path.dirname(__file__)
-    json_path = os.path.join(base_dir, "../data/cedict.json")
-    output_path = os.path.join(base_dir, "../data/cedict_embeddings.pkl")
+    parser = argparse.ArgumentParser(description="Embed CC-CEDICT definitions into a float16 matrix.")
+    parser.add_argument("--source", default=os.path.join(base_dir, "../data/cedict.jsonl"))
+    parser.add_argument("--output", default=os.path.join(base_dir, "../data/cedict_embeddings.npy"))
+    parser.add_argument("--metadata", default=os.path.join(base_dir, "../data/cedict_embeddings.tsv"))
+    parser.add_argument("--checkpoint-dir", default=os.path.join(base_dir, "../data/cedict_embeddings.chunks"))
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--chunk-size", type=int, default=8192)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
 
-    cedict = load_cedict_json(json_path)
-    embedded = embed_definitions(cedict)
-    save_embeddings(embedded, output_path)
-    print(f"Saved {len(embedded)} embedded entries to {output_path}")
\ No newline at end of file
+    texts = write_metadata(load_cedict_entries(args.source), args.metadata)
+    chunk_paths, dim = embed_definitions(
+        texts,
+        args.checkpoint_dir,
+        model_name=args.model,
+        batch_size=args.batch_size,
+        chunk_size=args.chunk_size,
+        processes=args.processes,
+    )
+    save_embeddings(chunk_paths, len(texts), dim, args.output)
+    shutil.rmtree(args.checkpoint_dir)
+    print(f"Saved {len(texts)} x {dim} float16 embeddings to {args.output} (metadata: {args.metadata})")
@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.future import select
+from database.database import AsyncSessionLocal
+from models import Flashcard, ReviewEvent, UserSettings
+from utils.fsrs import DEFAULT_PARAMETERS, fit_parameters, pad_histories, replay, to_rating
+
+# Fits FSRS parameters per user from their ReviewEvent log, one user per worker process.
+# Each fit replays all of the user's cards at once (utils.fsrs.fit_parameters). Fitted
+# parameters are saved to UserSettings.fsrs_params only when they beat the defaults, and
+# every reviewed card gets the stability/difficulty its history implies under whichever
+# parameters are kept, so a user who switches to FSRS starts from their real memory
+# state. Run scripts/db_columns.py first on databases created before FSRS.
+
+# (elapsed days, ratings) for one card's reviews, oldest first. Training keeps only the
+# first review of each day: FSRS models day-scale forgetting, and same-day repeats
+# would look like perfect recall after zero days.
+def card_history(events: list, first_per_day: bool = False) -> tuple:
+    days, ratings, previous = [], [], None
+    for created_at, quality in events:
+        day = created_at.date()
+        if first_per_day and day == previous:
+            continue
+        days.append((day - previous).days if previous else 0)
+        ratings.append(int(to_rating(quality)))
+        previous = day
+    return np.array(days, dtype=float), np.array(ratings)
+
+
+# (user_id, params, loss before, loss after, states); params is None when the defaults
+# are kept, and the losses are None when no card was reviewed on two different days
+def fit_user(user_id: str, cards: dict, iterations: int) -> tuple:
+    training = [h for h in (card_history(events, first_per_day=True) for events in cards.values()) if len(h[1]) > 1]
+    params, before, after = None, None, None
+    if training:
+        fitted, before, after = fit_parameters(training, iterations)
+        if after < before:
+            params = fitted
+
+    histories = [card_history(events) for events in cards.values()]
+    longest = max(len(ratings) for _, ratings in histories)
+    _, stability, difficulty = replay(params or DEFAULT_PARAMETERS, *pad_histories(histories, max_reviews=longest))
+    states = dict(zip(cards, zip(stability.tolist(), difficulty.tolist())))
+    return user_id, params, before, after, states
+
+
+# (user_id, {flashcard_id: [(created_at, quality)]}) one user at a time, oldest review
+# first. Rows come ordered by user, so a user's cards are complete once the next user's
+# rows start and only one user's log is held at a time.
+async def iter_review_log(db, user_id: str | None):
+    query = (
+        select(ReviewEvent.user_id, ReviewEvent.flashcard_id, ReviewEvent.created_at, ReviewEvent.rating)
+        # Events of deleted cards no longer form a card history
+        .where(ReviewEvent.flashcard_id.isnot(None))
+        .order_by(ReviewEvent.user_id, ReviewEvent.flashcard_id, ReviewEvent.created_at)
+        .execution_options(yield_per=10000)
+    )
+    if user_id:
+        query = query.where(ReviewEvent.user_id == user_id)
+
+    current, cards = None, {}
+    result = await db.stream(query)
+    async for row in result:
+        if row.user_id != current:
+            if cards:
+                yield current, cards
+            current, cards = row.user_id, {}
+        cards.setdefault(row.flashcard_id, []).append((row.created_at, row.rating))
+    if cards:
+        yield current, cards
+
+
+# params None resets the user to the defaults the states were replayed with
+async def save_fit(db, user_id: str, params: list | None, states: dict):
+    result = await db.execute(select(UserSettings).where(UserSettings.user_id == user_id))
+    settings = result.scalars().first()
+    if not settings and params is not None:
+        settings = UserSettings(user_id=user_id)
+        db.add(settings)
+    if settings:
+        settings.fsrs_params = params
+
+    existing = await db.execute(
+        select(Flashcard.id).where(Flashcard.user_id == user_id, Flashcard.id.in_(list(states)))
+    )
+    rows = [
+        {"id": card_id, "stability": states[card_id][0], "difficulty": states[card_id][1]}
+        for card_id in existing.scalars()
+    ]
+    if rows:
+        await db.execute(update(Flashcard), rows)
+    await db.commit()
+
+
+async def report_fit(db, fit: tuple, dry_run: bool) -> bool:
+    user, params, before, after, states = fit
+    if before is None:
+        print(f"{user}: no repeated reviews to fit (kept defaults)")
+    else:
+        print(f"{user}: log loss {before:.4f} -> {after:.4f}{'' if params else ' (kept defaults)'}")
+    if not dry_run:
+        await save_fit(db, user, params, states)
+    return params is not None and not dry_run
+
+
+# Each eligible user's fit is submitted as soon as their rows are read. At most two fits
+# per worker are in flight, so reading the log never runs far ahead of the pool.
+async def fit_fsrs(user_id=None, min_reviews=200, iterations=150, processes=None, dry_run=False):
+    loop = asyncio.get_running_loop()
+    max_pending = 2 * (processes or os.cpu_count() or 1)
+    users = eligible = saved = 0
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        async with AsyncSessionLocal() as log_db, AsyncSessionLocal() as db:
+            async for user, cards in iter_review_log(log_db, user_id):
+                users += 1
+                if sum(map(len, cards.values())) < min_reviews:
+                    continue
+                eligible += 1
+                pending.add(loop.run_in_executor(pool, fit_user, user, cards, iterations))
+                if len(pending) >= max_pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for fit in done:
+                        saved += await report_fit(db, fit.result(), dry_run)
+
+            for fit in asyncio.as_completed(pending):
+                saved += await report_fit(db, await fit, dry_run)
+
+    print(f"{eligible} of {users} users have at least {min_reviews} reviews")
+    print(f"Saved parameters for {saved} users")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit per-user FSRS parameters from the review log.")
+    parser.add_argument("--user", help="fit a single user")
+    parser.add_argument("--min-reviews", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=150)
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="report losses without saving")
+    args = parser.parse_args()
+    asyncio.run(fit_fsrs(args.user, args.min_reviews, args.iterations, args.processes, args.dry_run))
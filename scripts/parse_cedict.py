@@ -1,8 +1,14 @@
+import argparse
 import gzip
 import os
+import sys
 import json
 from collections import defaultdict
 
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.cedict_index import build_cedict_index
+
 def parse_cedict_line(line):
     # Skip comments and empty lines
     if line.startswith("#") or not line.strip():
@@ -23,18 +29,66 @@ def parse_cedict_line(line):
     except Exception:
         return None
 
-def parse_cedict_to_dict(file_path):
-    cedict = defaultdict(list)
-
+# --- Streaming pipeline: gzip lines -> parsed entries -> sink ---
+def iter_cedict_lines(file_path):
     with gzip.open(file_path, 'rt', encoding='utf-8') as f:
         for line in f:
-            parsed = parse_cedict_line(line)
-            if parsed:
-                key = parsed["simplified"]
-                cedict[key].append(parsed)
+            if not line.startswith("#") and line.strip():
+                yield line.rstrip("\n")
+
+def iter_cedict_entries(lines):
+    for line in lines:
+        parsed = parse_cedict_line(line)
+        if parsed:
+            yield parsed
+
+def iter_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def write_jsonl(entries, output_path):
+    count = 0
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    os.replace(tmp_path, output_path)
+    return count
 
+def parse_cedict_to_dict(file_path):
+    cedict = defaultdict(list)
+    for parsed in iter_cedict_entries(iter_cedict_lines(file_path)):
+        cedict[parsed["simplified"]].append(parsed)
     return cedict
 
+# --- Incremental updates between releases ---
+def diff_cedict_releases(old_path, new_path):
+    # Only line hashes are held for the full files; changed lines themselves are few
+    old_hashes = {hash(line) for line in iter_cedict_lines(old_path)}
+    new_hashes = set()
+    added = []
+    for line in iter_cedict_lines(new_path):
+        digest = hash(line)
+        new_hashes.add(digest)
+        if digest not in old_hashes:
+            added.append(line)
+    removed = [line for line in iter_cedict_lines(old_path) if hash(line) not in new_hashes]
+    return added, removed
+
+def entry_signature(entry):
+    return (entry["traditional"], entry["simplified"], entry["pinyin"], tuple(entry["definitions"]))
+
+def apply_cedict_diff(base_entries, added_lines, removed_lines):
+    removed = {entry_signature(e) for e in iter_cedict_entries(removed_lines)}
+    for entry in base_entries:
+        if entry_signature(entry) not in removed:
+            yield entry
+    yield from iter_cedict_entries(added_lines)
+
 def preview_entries(cedict_dict, n=5):
     for i, (simp, entries) in enumerate(cedict_dict.items()):
         print(f"{simp}: {entries}")
@@ -48,9 +102,30 @@ def export_to_json(data, output_path):
 
 if __name__ == "__main__":
     base_dir = os.path.dirname(__file__)
-    cedict_path = os.path.join(base_dir, "../data/cedict_1_0_ts_utf-8_mdbg.txt.gz")
-    output_path = os.path.join(base_dir, "../data/cedict.json")
+    parser = argparse.ArgumentParser(description="Parse CC-CEDICT into JSONL and the compiled lookup index.")
+    parser.add_argument("--source", default=os.path.join(base_dir, "../data/cedict_1_0_ts_utf-8_mdbg.txt.gz"))
+    parser.add_argument("--jsonl", default=os.path.join(base_dir, "../data/cedict.jsonl"))
+    parser.add_argument("--index", default=os.path.join(base_dir, "../data/cedict.idx"))
+    parser.add_argument("--json", help="also write the legacy keyed JSON export to this path")
+    parser.add_argument("--previous", help="previous release .gz; only changed lines are re-parsed against --jsonl")
+    args = parser.parse_args()
+
+    if args.previous:
+        added, removed = diff_cedict_releases(args.previous, args.source)
+        print(f"{len(added)} added / {len(removed)} removed lines since {args.previous}")
+        entries = apply_cedict_diff(iter_jsonl(args.jsonl), added, removed)
+    else:
+        entries = iter_cedict_entries(iter_cedict_lines(args.source))
+
+    count = write_jsonl(entries, args.jsonl)
+    print(f"Wrote {count} entries to {args.jsonl}")
+
+    headwords = build_cedict_index(iter_jsonl(args.jsonl), args.index)
+    print(f"Wrote {headwords} headwords to {args.index}")
 
-    cedict_data = parse_cedict_to_dict(cedict_path)
-    preview_entries(cedict_data)
-    export_to_json(cedict_data, output_path)
\ No newline at end of file
+    if args.json:
+        cedict_data = defaultdict(list)
+        for entry in iter_jsonl(args.jsonl):
+            cedict_data[entry["simplified"]].append(entry)
+        preview_entries(cedict_data)
+        export_to_json(cedict_data, args.json)
@@ -0,0 +1,339 @@
+import asyncio
+import os
+from functools import partial
+from datetime import datetime, timedelta
+from sqlalchemy import delete, tuple_
+from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.generated_content import GeneratedContent
+from database.database import AsyncSessionLocal
+from utils.singleflight import SingleFlight
+from utils.ttlcache import TTLCache  # re-exported for existing imports
+from utils.gpt import (
+    generate_flashcard_with_gpt,
+    generate_flashcards_batch_with_gpt,
+    normalize_word,
+    FALLBACK_FLASHCARD,
+)
+
+FLASHCARD_CACHE_SIZE = int(os.getenv("FLASHCARD_CACHE_SIZE", "10000"))
+FLASHCARD_CACHE_TTL = float(os.getenv("FLASHCARD_CACHE_TTL", str(24 * 3600)))
+FLASHCARD_DB_CACHE_DAYS = int(os.getenv("FLASHCARD_DB_CACHE_DAYS", "90"))
+BATCH_GROUP_SIZE = int(os.getenv("BATCH_GROUP_SIZE", "8"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+FLASHCARD_COUNT_TTL = float(os.getenv("FLASHCARD_COUNT_TTL", "60"))
+
+flashcard_cache = TTLCache(FLASHCARD_CACHE_SIZE, FLASHCARD_CACHE_TTL)
+# (user_id, folder_id) -> card count; dropped on this worker's writes, expires for others'
+flashcard_count_cache = TTLCache(10000, FLASHCARD_COUNT_TTL)
+
+db_cache_stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+# In-flight generations keyed like the cache, shared by single, batch and streaming previews
+generation_flights = SingleFlight()
+
+
+def content_key(word: str, source_lang: str, target_lang: str):
+    return (normalize_word(word), source_lang, target_lang)
+
+
+async def _load_from_db(db: AsyncSession, key):
+    word, source_lang, target_lang = key
+    cutoff = datetime.utcnow() - timedelta(days=FLASHCARD_DB_CACHE_DAYS)
+    result = await db.execute(
+        select(
+            GeneratedContent.translation,
+            GeneratedContent.example,
+            GeneratedContent.notes,
+            GeneratedContent.pos,
+        ).where(
+            GeneratedContent.word == word,
+            GeneratedContent.source_lang == source_lang,
+            GeneratedContent.target_lang == target_lang,
+            GeneratedContent.created_at >= cutoff,
+        )
+    )
+    row = result.first()
+    return tuple(row) if row else None
+
+
+async def _store_in_db(db: AsyncSession, entries: list):
+    now = datetime.utcnow()
+    rows = [
+        {
+            "word": word,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "translation": translation,
+            "example": example,
+            "notes": notes,
+            "pos": pos,
+            "created_at": now,
+        }
+        for (word, source_lang, target_lang), (translation, example, notes, pos) in entries
+    ]
+    query = insert(GeneratedContent).values(rows)
+    await db.execute(
+        query.on_conflict_do_update(
+            index_elements=["word", "source_lang", "target_lang"],
+            set_={
+                "translation": query.excluded.translation,
+                "example": query.excluded.example,
+                "notes": query.excluded.notes,
+                "pos": query.excluded.pos,
+                "created_at": query.excluded.created_at,
+            },
+        )
+    )
+    await db.commit()
+
+
+async def _remember(db: AsyncSession, entries: list):
+    entries = [(key, content) for key, content in entries if content[0] != FALLBACK_FLASHCARD[0]]
+    if not entries:
+        return
+    for key, content in entries:
+        flashcard_cache.set(key, content)
+    try:
+        await _store_in_db(db, entries)
+        db_cache_stats["writes"] += len(entries)
+    except Exception as e:
+        print(f"[Cache Error] {str(e)}")
+        db_cache_stats["errors"] += 1
+        await db.rollback()
+
+
+# Memory then DB; returns None on a miss without generating anything
+async def lookup_flashcard_content(db: AsyncSession, word: str, source_lang: str, target_lang: str):
+    key = content_key(word, source_lang, target_lang)
+
+    cached = flashcard_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        stored = await _load_from_db(db, key)
+    except Exception as e:
+        print(f"[Cache Error] {str(e)}")
+        db_cache_stats["errors"] += 1
+        await db.rollback()
+        stored = None
+    if stored is not None:
+        db_cache_stats["hits"] += 1
+        flashcard_cache.set(key, stored)
+        return stored
+    db_cache_stats["misses"] += 1
+    return None
+
+
+async def remember_flashcard_content(db: AsyncSession, word: str, source_lang: str, target_lang: str, content):
+    await _remember(db, [(content_key(word, source_lang, target_lang), content)])
+
+
+# Content of an identical in-flight generation, or None if there is none (or it was abandoned)
+async def await_generation_flight(word: str, source_lang: str, target_lang: str):
+    flight = generation_flights.join(content_key(word, source_lang, target_lang))
+    if flight is None:
+        return None
+    try:
+        return await asyncio.shield(flight)
+    except Exception:
+        return None
+
+
+async def _generate_and_remember(word: str, source_lang: str, target_lang: str):
+    content = await generate_flashcard_with_gpt(word, source_lang, target_lang)
+    # own session: the leader's request may finish (or be cancelled) before followers do
+    async with AsyncSessionLocal() as db:
+        await remember_flashcard_content(db, word, source_lang, target_lang, content)  # failures are skipped
+    return content
+
+
+async def get_flashcard_content(db: AsyncSession, word: str, source_lang: str, target_lang: str):
+    content = await await_generation_flight(word, source_lang, target_lang)
+    if content is not None:
+        return content
+
+    content = await lookup_flashcard_content(db, word, source_lang, target_lang)
+    if content is not None:
+        return content
+
+    return await generation_flights.do(
+        content_key(word, source_lang, target_lang),
+        partial(_generate_and_remember, word, source_lang, target_lang),
+    )
+
+
+# Yields ((word, source_lang, target_lang), content) for each item as soon as it is ready:
+# memory hits first, then one DB round-trip for the rest, then multi-word GPT prompts.
+# Items sharing a content_key ("Hello" and "hello") are looked up once but each yielded.
+async def iter_flashcard_content(db: AsyncSession, items: list):
+    requested = {}
+    for item in items:
+        requested.setdefault(content_key(*item), []).append(item)
+    async for item, content in _iter_unique_content(db, [group[0] for group in requested.values()]):
+        for requested_item in requested.get(content_key(*item), [item]):
+            yield requested_item, content
+
+
+async def _iter_unique_content(db: AsyncSession, items: list):
+    pending = {}
+    for word, source_lang, target_lang in items:
+        key = content_key(word, source_lang, target_lang)
+        cached = flashcard_cache.get(key)
+        if cached is not None:
+            yield (word, source_lang, target_lang), cached
+        else:
+            pending[key] = (word, source_lang, target_lang)
+
+    if not pending:
+        return
+
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=FLASHCARD_DB_CACHE_DAYS)
+        result = await db.execute(
+            select(
+                GeneratedContent.word,
+                GeneratedContent.source_lang,
+                GeneratedContent.target_lang,
+                GeneratedContent.translation,
+                GeneratedContent.example,
+                GeneratedContent.notes,
+                GeneratedContent.pos,
+            ).where(
+                tuple_(
+                    GeneratedContent.word,
+                    GeneratedContent.source_lang,
+                    GeneratedContent.target_lang,
+                ).in_(list(pending)),
+                GeneratedContent.created_at >= cutoff,
+            )
+        )
+        rows = result.all()
+    except Exception as e:
+        print(f"[Cache Error] {str(e)}")
+        db_cache_stats["errors"] += 1
+        await db.rollback()
+        rows = []
+
+    for row in rows:
+        key = (row.word, row.source_lang, row.target_lang)
+        item = pending.pop(key, None)
+        if item is None:
+            continue
+        content = (row.translation, row.example, row.notes, row.pos)
+        db_cache_stats["hits"] += 1
+        flashcard_cache.set(key, content)
+        yield item, content
+    db_cache_stats["misses"] += len(pending)
+
+    # Words someone else is already generating are awaited instead of re-requested
+    flights = {}
+    for key in list(pending):
+        flight = generation_flights.join(key)
+        if flight is not None:
+            flights[key] = (pending.pop(key), flight)
+        else:
+            flights[key] = (pending[key], generation_flights.lead(key))
+
+    groups = {}
+    for item in pending.values():
+        groups.setdefault(item[1:], []).append(item[0])
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_group(source_lang, target_lang, words):
+        async with semaphore:
+            results = await generate_flashcards_batch_with_gpt(words, source_lang, target_lang)
+        missing = [w for w in words if w not in results]
+        if missing:
+            async def single(word):
+                async with semaphore:
+                    return word, await generate_flashcard_with_gpt(word, source_lang, target_lang)
+            results.update(await asyncio.gather(*(single(w) for w in missing)))
+
+        entries = []
+        for word, content in results.items():
+            key = content_key(word, source_lang, target_lang)
+            flight = flights[key][1]
+            if not flight.done():
+                flight.set_result(content)
+            entries.append(((word, source_lang, target_lang), content))
+        return entries, True
+
+    async def follow(item, flight):
+        try:
+            content = await asyncio.shield(flight)
+        except Exception:
+            content = await generate_flashcard_with_gpt(*item)
+        return [(item, content)], False
+
+    tasks = [
+        asyncio.create_task(run_group(source_lang, target_lang, words[i:i + BATCH_GROUP_SIZE]))
+        for (source_lang, target_lang), words in groups.items()
+        for i in range(0, len(words), BATCH_GROUP_SIZE)
+    ]
+    tasks += [
+        asyncio.create_task(follow(item, flight))
+        for key, (item, flight) in flights.items()
+        if key not in pending
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            entries, generated = await next_done
+            if generated:
+                await _remember(db, [(content_key(*item), content) for item, content in entries])
+            for item, content in entries:
+                yield item, content
+    finally:
+        for task in tasks:
+            task.cancel()
+        for key in pending:
+            flight = flights[key][1]
+            if not flight.done():
+                flight.set_exception(RuntimeError("Batch generation abandoned"))
+
+
+async def purge_flashcard_cache(
+    db: AsyncSession,
+    word: str | None = None,
+    source_lang: str | None = None,
+    target_lang: str | None = None,
+) -> dict:
+    norm = normalize_word(word) if word else None
+
+    def matches(key):
+        return (
+            (norm is None or key[0] == norm)
+            and (source_lang is None or key[1] == source_lang)
+            and (target_lang is None or key[2] == target_lang)
+        )
+
+    no_filter = norm is None and source_lang is None and target_lang is None
+    memory_purged = flashcard_cache.purge(None if no_filter else matches)
+
+    query = delete(GeneratedContent)
+    if norm is not None:
+        query = query.where(GeneratedContent.word == norm)
+    if source_lang is not None:
+        query = query.where(GeneratedContent.source_lang == source_lang)
+    if target_lang is not None:
+        query = query.where(GeneratedContent.target_lang == target_lang)
+    result = await db.execute(query)
+    await db.commit()
+
+    return {"memory_purged": memory_purged, "db_purged": result.rowcount}
+
+
+def invalidate_flashcard_counts(user_id: str):
+    flashcard_count_cache.purge(lambda key: key[0] == user_id)
+
+
+def cache_metrics() -> dict:
+    return {
+        "flashcard_memory": flashcard_cache.metrics(),
+        "flashcard_counts": flashcard_count_cache.metrics(),
+        "flashcard_db": dict(db_cache_stats),
+        "singleflight": generation_flights.metrics(),
+    }
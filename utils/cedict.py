@@ -0,0 +1,149 @@
+import json
+import os
+import re
+from functools import lru_cache
+from utils.cedict_index import CedictIndex
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+CEDICT_PATH = os.getenv("CEDICT_PATH", os.path.join(DATA_DIR, "cedict.json"))
+CEDICT_INDEX_PATH = os.getenv("CEDICT_INDEX_PATH", os.path.join(DATA_DIR, "cedict.idx"))
+
+# Definitions that make a poor flashcard translation when a better reading exists
+WEAK_DEFINITION_PREFIXES = ("surname ", "variant of ", "old variant of ", "see ", "used in ")
+MAX_TRANSLATION_DEFINITIONS = 3
+HAN_CHARACTER = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+
+
+# CC-CEDICT pinyin ("lu:4 ma5") in the same TONE3 style get_phonetic produces ("lv4 ma")
+def normalize_cedict_pinyin(pinyin: str) -> str:
+    syllables = []
+    for syllable in pinyin.replace("u:", "v").split():
+        if syllable.endswith("5"):
+            syllable = syllable[:-1]
+        syllables.append(syllable.lower())
+    return " ".join(syllables)
+
+
+def pick_entry(entries: list) -> dict:
+    for entry in entries:
+        definitions = entry["definitions"]
+        if definitions and not definitions[0].lower().startswith(WEAK_DEFINITION_PREFIXES):
+            return entry
+    return entries[0]
+
+
+# Adds traditional headwords so they resolve to the same entries as their simplified form
+def with_traditional_keys(by_simplified: dict) -> dict:
+    entries = {simplified: list(defs) for simplified, defs in by_simplified.items()}
+    for simplified, defs in by_simplified.items():
+        for entry in defs:
+            traditional = entry["traditional"]
+            if traditional != simplified:
+                entries.setdefault(traditional, []).append(entry)
+    return entries
+
+
+# Backed by either a compiled mmap CedictIndex or (fallback) an in-memory dict
+class CedictDictionary:
+    def __init__(self, entries, source: str):
+        self._entries = entries
+        self.source = source
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_index(cls, path: str):
+        return cls(CedictIndex(path), "index")
+
+    @classmethod
+    def from_json(cls, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(with_traditional_keys(json.load(f)), "json")
+
+    def lookup(self, word: str) -> list | None:
+        entries = self._entries.get(word)
+        if entries:
+            self.hits += 1
+            return entries
+        self.misses += 1
+        return None
+
+    def prefix(self, prefix: str, limit: int = 20) -> list:
+        if isinstance(self._entries, CedictIndex):
+            return self._entries.prefix(prefix, limit)
+        keys = sorted(key for key in self._entries if key.startswith(prefix))[:limit]
+        return [(key, self._entries[key]) for key in keys]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def metrics(self) -> dict:
+        return {
+            "loaded": True,
+            "source": self.source,
+            "headwords": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_dictionary: CedictDictionary | None = None
+
+
+# Prefers the compiled index (near-instant, shared pages); the JSON export is parsed in full
+def load_cedict(index_path: str = CEDICT_INDEX_PATH, json_path: str = CEDICT_PATH):
+    global _dictionary
+    if os.path.exists(index_path):
+        _dictionary = CedictDictionary.from_index(index_path)
+        path = index_path
+    elif os.path.exists(json_path):
+        _dictionary = CedictDictionary.from_json(json_path)
+        path = json_path
+    else:
+        print(f"[CEDICT] Neither {index_path} nor {json_path} found; Chinese previews will use GPT only")
+        return None
+    simplified_char.cache_clear()
+    print(f"[CEDICT] Loaded {len(_dictionary)} headwords from {path}")
+    return _dictionary
+
+
+def get_cedict() -> CedictDictionary | None:
+    return _dictionary
+
+
+# {"translation", "phonetic", "traditional"} for a covered word, else None
+def lookup_cedict(word: str) -> dict | None:
+    if _dictionary is None:
+        return None
+    entries = _dictionary.lookup(word)
+    if not entries:
+        return None
+    entry = pick_entry(entries)
+    return {
+        "translation": "; ".join(entry["definitions"][:MAX_TRANSLATION_DEFINITIONS]),
+        "phonetic": normalize_cedict_pinyin(entry["pinyin"]),
+        "traditional": entry["traditional"],
+    }
+
+
+@lru_cache(maxsize=20000)
+def simplified_char(char: str) -> str:
+    if _dictionary is None:
+        return char
+    for entry in _dictionary._entries.get(char) or ():
+        if entry["traditional"] == char:
+            return entry["simplified"]
+    return char
+
+
+# Character-by-character traditional -> simplified; text is unchanged without a dictionary
+def to_simplified(text: str) -> str:
+    if not HAN_CHARACTER.search(text):
+        return text
+    return "".join(simplified_char(c) if HAN_CHARACTER.match(c) else c for c in text)
+
+
+def cedict_metrics() -> dict:
+    if _dictionary is None:
+        return {"loaded": False}
+    return _dictionary.metrics()
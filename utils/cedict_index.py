@@ -0,0 +1,141 @@
+import json
+import mmap
+import os
+import struct
+
+# On-disk layout (little-endian):
+#   header   "CEDICTX1" | u32 record count | u32 reserved
+#   offsets  u32 file offset of each record, in key order
+#   records  u16 key length | key (UTF-8) | u32 payload length | payload
+# Keys are sorted by their UTF-8 bytes (same as code point order), so exact and
+# prefix lookups are a binary search over the offset table. The payload is compact
+# JSON: [[traditional, simplified, pinyin, [definitions...]], ...]
+INDEX_MAGIC = b"CEDICTX1"
+HEADER = struct.Struct("<8sII")
+OFFSET = struct.Struct("<I")
+KEY_LEN = struct.Struct("<H")
+PAYLOAD_LEN = struct.Struct("<I")
+
+
+def encode_entry_row(entry: dict) -> bytes:
+    row = [entry["traditional"], entry["simplified"], entry["pinyin"], entry["definitions"]]
+    return json.dumps(row, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def join_entry_rows(rows: list) -> bytes:
+    return b"[" + b",".join(rows) + b"]"
+
+
+def encode_entries(entries: list) -> bytes:
+    return join_entry_rows([encode_entry_row(e) for e in entries])
+
+
+# Groups a stream of entries by simplified and traditional headword, keeping only encoded rows
+def build_cedict_index(entries, path: str) -> int:
+    rows_by_key = {}
+    for entry in entries:
+        row = encode_entry_row(entry)
+        rows_by_key.setdefault(entry["simplified"], []).append(row)
+        if entry["traditional"] != entry["simplified"]:
+            rows_by_key.setdefault(entry["traditional"], []).append(row)
+    return write_cedict_index(((key, join_entry_rows(rows)) for key, rows in rows_by_key.items()), path)
+
+
+def decode_entries(payload) -> list:
+    return [
+        {"traditional": trad, "simplified": simp, "pinyin": pinyin, "definitions": definitions}
+        for trad, simp, pinyin, definitions in json.loads(bytes(payload).decode("utf-8"))
+    ]
+
+
+# items: iterable of (key, payload bytes); written atomically to path
+def write_cedict_index(items, path: str) -> int:
+    records = sorted((key.encode("utf-8"), payload) for key, payload in items)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(INDEX_MAGIC, len(records), 0))
+        offset = HEADER.size + OFFSET.size * len(records)
+        for key, payload in records:
+            f.write(OFFSET.pack(offset))
+            offset += KEY_LEN.size + len(key) + PAYLOAD_LEN.size + len(payload)
+        for key, payload in records:
+            f.write(KEY_LEN.pack(len(key)))
+            f.write(key)
+            f.write(PAYLOAD_LEN.pack(len(payload)))
+            f.write(payload)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+# Read-only view over a compiled index; the mmap is shared between worker processes
+class CedictIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a CEDICT index")
+
+    def __len__(self):
+        return self._count
+
+    def _offset(self, i: int) -> int:
+        return OFFSET.unpack_from(self._mm, HEADER.size + OFFSET.size * i)[0]
+
+    def _key(self, i: int) -> bytes:
+        offset = self._offset(i)
+        (length,) = KEY_LEN.unpack_from(self._mm, offset)
+        start = offset + KEY_LEN.size
+        return self._mm[start:start + length]
+
+    def _record(self, i: int):
+        offset = self._offset(i)
+        (key_length,) = KEY_LEN.unpack_from(self._mm, offset)
+        key_start = offset + KEY_LEN.size
+        payload_at = key_start + key_length
+        (payload_length,) = PAYLOAD_LEN.unpack_from(self._mm, payload_at)
+        payload_start = payload_at + PAYLOAD_LEN.size
+        return self._mm[key_start:payload_at], self._mm[payload_start:payload_start + payload_length]
+
+    def _bisect_left(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, word: str, default=None):
+        key = word.encode("utf-8")
+        i = self._bisect_left(key)
+        if i < self._count:
+            found, payload = self._record(i)
+            if found == key:
+                return decode_entries(payload)
+        return default
+
+    def __contains__(self, word: str):
+        key = word.encode("utf-8")
+        i = self._bisect_left(key)
+        return i < self._count and self._key(i) == key
+
+    # [(headword, entries)] for headwords starting with prefix, in key order
+    def prefix(self, prefix: str, limit: int = 20) -> list:
+        key = prefix.encode("utf-8")
+        results = []
+        i = self._bisect_left(key)
+        while i < self._count and len(results) < limit:
+            found, payload = self._record(i)
+            if not found.startswith(key):
+                break
+            results.append((found.decode("utf-8"), decode_entries(payload)))
+            i += 1
+        return results
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import re
+import unicodedata
+import zlib
+import numpy as np
+from sqlalchemy.future import select
+from database.database import AsyncSessionLocal
+from models import Flashcard
+from utils.ttlcache import TTLCache
+from utils.singleflight import SingleFlight
+
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.9"))
+DUPLICATE_INDEX_USERS = int(os.getenv("DUPLICATE_INDEX_USERS", "1000"))
+# Other workers may have added cards, so per-user indexes are rebuilt after this long
+DUPLICATE_INDEX_TTL = float(os.getenv("DUPLICATE_INDEX_TTL", "600"))
+# Per-worker budget for all cached indexes together; least recently used users go first
+DUPLICATE_INDEX_MAX_BYTES = int(os.getenv("DUPLICATE_INDEX_MAX_BYTES", str(128 * 1024 * 1024)))
+
+# A card has a few dozen n-grams, so 512 buckets keep collisions well under the threshold
+# margin; rows are stored as float16 (1 KB per card) and widened per block for matmuls
+VECTOR_DIM = 512
+VECTOR_DTYPE = np.float16
+NGRAM_SIZES = (1, 2, 3)
+# "to eat" / "eat", "the dog" / "dog", "un chat" / "chat"
+LEADING_FILLERS = re.compile(r"^(to|a|an|the|le|la|les|l'|un|une|des)\s+")
+# Rows widened to float32 at a time; a pair of blocks scores into BLOCK_ROWS² floats
+BLOCK_ROWS = 1024
+# Spare rows added when a full index grows, as a fraction of its size; an index less
+# than half full after deletes is shrunk back to its cards plus the same slack
+GROWTH_FRACTION = 0.125
+
+
+def normalize_card_text(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "").casefold()
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s']", " ", text)
+    text = " ".join(text.split())
+    return LEADING_FILLERS.sub("", text)
+
+
+def _text_vector(text: str, out: np.ndarray):
+    padded = f" {text} "
+    for n in NGRAM_SIZES:
+        for i in range(len(padded) - n + 1):
+            digest = zlib.crc32(padded[i:i + n].encode("utf-8"))
+            out[digest % VECTOR_DIM] += 1.0 if digest & 0x80000000 else -1.0
+
+
+# Hashed character n-grams over word + translation; the pair is unordered, so a
+# "吃 → eat" card and an "eat → 吃" card embed identically. This catches spelling-level
+# overlap (re-added cards, fillers, swapped sides, accents), not synonyms: "eat" and
+# "consume" do not match. Sentence-transformer embeddings (utils/semantic.py) would, but
+# need torch on every worker and ~10 ms of CPU per card on save, while the model in use
+# there is English-only and would not relate 吃 to "eat" either.
+def card_vectors(pairs: list) -> np.ndarray:
+    vectors = np.zeros((len(pairs), VECTOR_DIM), dtype=np.float32)
+    for row, (word, translation) in enumerate(pairs):
+        _text_vector(normalize_card_text(word), vectors[row])
+        _text_vector(normalize_card_text(translation), vectors[row])
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(VECTOR_DTYPE)
+
+
+# One user's cards as a unit-vector matrix, sized to the cards it was built from, grown
+# by a fraction when cards are added and shrunk after many deletes. Mutated on the event
+# loop only; work in other threads goes through snapshot().
+class UserVectorIndex:
+    def __init__(self, ids: list, vectors: np.ndarray):
+        self.ids = list(ids)
+        self.rows = {card_id: i for i, card_id in enumerate(self.ids)}
+        self._matrix = np.array(vectors, dtype=VECTOR_DTYPE).reshape(len(self.ids), VECTOR_DIM)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:len(self.ids)]
+
+    # Approximate memory held, for the cache's byte budget
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes + len(self.ids) * 200
+
+    def _reallocate(self, rows: int):
+        matrix = np.empty((rows, VECTOR_DIM), dtype=VECTOR_DTYPE)
+        matrix[:len(self.ids)] = self._matrix[:len(self.ids)]
+        self._matrix = matrix
+
+    def _slack(self, rows: int) -> int:
+        return max(16, int(rows * GROWTH_FRACTION))
+
+    def add(self, card_id: str, vector: np.ndarray):
+        if card_id in self.rows:
+            self._matrix[self.rows[card_id]] = vector
+            return
+        if len(self.ids) == len(self._matrix):
+            self._reallocate(len(self._matrix) + self._slack(len(self._matrix)))
+        self.rows[card_id] = len(self.ids)
+        self._matrix[len(self.ids)] = vector
+        self.ids.append(card_id)
+
+    def remove(self, card_id: str):
+        row = self.rows.pop(card_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            self.ids[row] = self.ids[last]
+            self.rows[self.ids[row]] = row
+        self.ids.pop()
+        if len(self._matrix) > 2 * (len(self.ids) + self._slack(len(self.ids))):
+            self._reallocate(len(self.ids) + self._slack(len(self.ids)))
+
+    # Copies of the ids and vectors, safe to read in a worker thread while the index
+    # keeps changing on the event loop
+    def snapshot(self) -> tuple:
+        return list(self.ids), self._matrix[:len(self.ids)].copy()
+
+    def _block(self, start: int) -> np.ndarray:
+        return _widen(self._matrix[:len(self.ids)], start)
+
+    # [(card_id, score)] above threshold, best first
+    def query(self, vector: np.ndarray, threshold: float = DUPLICATE_THRESHOLD, k: int = 5) -> list:
+        if not self.ids:
+            return []
+        vector = np.asarray(vector, dtype=np.float32)
+        scores = np.concatenate([self._block(start) @ vector for start in range(0, len(self.ids), BLOCK_ROWS)])
+        hits = np.flatnonzero(scores >= threshold)
+        hits = hits[np.argsort(-scores[hits])][:k]
+        # float16 rounding can put a self-match just above 1
+        return [(self.ids[i], round(min(float(scores[i]), 1.0), 4)) for i in hits]
+
+
+def _widen(matrix: np.ndarray, start: int) -> np.ndarray:
+    return matrix[start:start + BLOCK_ROWS].astype(np.float32)
+
+
+# Groups of card ids connected by similarity >= threshold, over a snapshot() so it can
+# run in a worker thread. Scores each pair of row blocks once (upper triangle only), so
+# peak memory is two float32 blocks and their BLOCK_ROWS x BLOCK_ROWS product regardless
+# of collection size.
+def duplicate_groups(ids: list, matrix: np.ndarray, threshold: float = DUPLICATE_THRESHOLD) -> list:
+    parent = list(range(len(ids)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for start in range(0, len(ids), BLOCK_ROWS):
+        block = _widen(matrix, start)
+        for other in range(start, len(ids), BLOCK_ROWS):
+            rows, cols = np.nonzero(block @ (block if other == start else _widen(matrix, other)).T >= threshold)
+            rows += start
+            cols += other
+            for i, j in zip(rows.tolist(), cols.tolist()):
+                if i < j:
+                    parent[find(i)] = find(j)
+
+    groups = {}
+    for i in range(len(ids)):
+        groups.setdefault(find(i), []).append(ids[i])
+    return [group for group in groups.values() if len(group) > 1]
+
+
+_indexes = TTLCache(
+    DUPLICATE_INDEX_USERS, DUPLICATE_INDEX_TTL,
+    maxbytes=DUPLICATE_INDEX_MAX_BYTES, sizeof=lambda index: index.nbytes,
+)
+_builds = SingleFlight()
+
+
+# Runs in its own session: followers of the shared build must not depend on the leader
+# request's session, which is closed when that request finishes
+async def _build_index(user_id: str) -> UserVectorIndex:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Flashcard.id, Flashcard.word, Flashcard.translation).where(Flashcard.user_id == user_id)
+        )
+        rows = result.all()
+    # Vectorizing a large collection is CPU-bound, so it runs off the event loop
+    vectors = await asyncio.to_thread(card_vectors, [(r.word, r.translation) for r in rows])
+    index = UserVectorIndex([r.id for r in rows], vectors)
+    _indexes.set(user_id, index)
+    return index
+
+
+async def get_user_index(user_id: str) -> UserVectorIndex:
+    index = _indexes.get(user_id)
+    if index is not None:
+        return index
+    return await _builds.do(user_id, lambda: _build_index(user_id))
+
+
+# Incremental maintenance; a user without a cached index is simply rebuilt on next use
+def index_card(user_id: str, card_id: str, word: str, translation: str):
+    index = _indexes.get(user_id)
+    if index is not None:
+        index.add(card_id, card_vectors([(word, translation)])[0])
+        _indexes.resize(user_id)
+
+
+def unindex_card(user_id: str, card_id: str):
+    index = _indexes.get(user_id)
+    if index is not None:
+        index.remove(card_id)
+        _indexes.resize(user_id)
+
+
+def invalidate_user_index(user_id: str):
+    _indexes.delete(user_id)
+
+
+def duplicate_index_metrics() -> dict:
+    return {**_indexes.metrics(), "builds": _builds.metrics()}
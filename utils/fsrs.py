@@ -0,0 +1,167 @@
+import numpy as np
+
+# FSRS-4.5 (Free Spaced Repetition Scheduler). A card's memory state is its stability S
+# (days until recall probability falls to 90%) and difficulty D (1-10). The formulas
+# below take an `xp` namespace so the same code runs on NumPy arrays and, through
+# utils.scheduler.SQLMath, as SQL expressions.
+
+DECAY = -0.5
+FACTOR = 19 / 81  # makes retrievability(S, S) == 0.9
+DEFAULT_RETENTION = 0.9
+MIN_STABILITY = 0.01
+MAX_INTERVAL = 36500
+
+DEFAULT_PARAMETERS = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+)
+PARAMETER_BOUNDS = (
+    (0.1, 100), (0.1, 100), (0.1, 100), (0.1, 100), (1, 10), (0.1, 5), (0.1, 5), (0, 0.5), (0, 3),
+    (0.1, 0.8), (0.01, 2.5), (0.5, 5), (0.01, 0.2), (0.01, 0.9), (0.01, 2), (0, 1), (1, 4),
+)
+
+# SM-2 quality 0-5 -> FSRS rating: 1 again, 2 hard, 3 good, 4 easy
+RATINGS = np.array([1, 1, 1, 2, 3, 4])
+
+
+def to_rating(quality):
+    return RATINGS[quality]
+
+
+def retrievability(elapsed, stability, xp=np):
+    return xp.power(1 + FACTOR * elapsed / stability, DECAY)
+
+
+def initial_stability(w, rating, xp=np):
+    return xp.where(rating == 1, w[0], xp.where(rating == 2, w[1], xp.where(rating == 3, w[2], w[3])))
+
+
+def initial_difficulty(w, rating, xp=np):
+    return xp.clip(w[4] - (rating - 3) * w[5], 1, 10)
+
+
+def next_difficulty(w, difficulty, rating, xp=np):
+    changed = difficulty - w[6] * (rating - 3)
+    # Mean reversion towards the difficulty of a first "good"
+    return xp.clip(w[7] * initial_difficulty(w, 3, xp) + (1 - w[7]) * changed, 1, 10)
+
+
+def recall_stability(w, stability, difficulty, r, rating, xp=np):
+    hard_penalty = xp.where(rating == 2, w[15], 1.0)
+    easy_bonus = xp.where(rating == 4, w[16], 1.0)
+    growth = xp.exp(w[8]) * (11 - difficulty) * xp.power(stability, -w[9]) * (xp.exp((1 - r) * w[10]) - 1)
+    return stability * (1 + growth * hard_penalty * easy_bonus)
+
+
+def forget_stability(w, stability, difficulty, r, xp=np):
+    return w[11] * xp.power(difficulty, -w[12]) * (xp.power(stability + 1, w[13]) - 1) * xp.exp((1 - r) * w[14])
+
+
+# New (stability, difficulty) after a review with the given rating, elapsed days after
+# the previous one. A missing stability (NaN / NULL) means the card has no FSRS state
+# yet, so the rating is treated as its first.
+def step(w, stability, difficulty, elapsed, rating, xp=np):
+    new = xp.isnull(stability)
+    r = retrievability(elapsed, stability, xp)
+    stability_after = xp.where(
+        rating == 1,
+        forget_stability(w, stability, difficulty, r, xp),
+        recall_stability(w, stability, difficulty, r, rating, xp),
+    )
+    stability_after = xp.where(new, initial_stability(w, rating, xp), stability_after)
+    difficulty_after = xp.where(new, initial_difficulty(w, rating, xp), next_difficulty(w, difficulty, rating, xp))
+    return xp.clip(stability_after, MIN_STABILITY, MAX_INTERVAL), difficulty_after
+
+
+# Memory state for cards scheduled so far only by SM-2 (no stability, but an interval):
+# stability is taken as the current interval, the gap SM-2 expected the card to survive,
+# and difficulty from the ease factor (the default 2.5 maps to 6, the 1.3 floor to 8.4).
+# Cards without an interval keep a missing stability and are treated as new by step.
+def seed_state(stability, difficulty, interval, ease_factor, xp=np):
+    seeded = xp.isnull(stability) & (interval > 0)
+    return (
+        xp.where(seeded, xp.clip(interval, MIN_STABILITY, MAX_INTERVAL), stability),
+        xp.where(seeded, xp.clip(11 - 2 * ease_factor, 1, 10), difficulty),
+    )
+
+
+# Whole days until recall probability drops to the desired retention
+def next_interval(stability, retention=DEFAULT_RETENTION, xp=np):
+    interval = stability / FACTOR * (retention ** (1 / DECAY) - 1)
+    return xp.clip(xp.floor(interval + 0.5), 1, MAX_INTERVAL)
+
+
+class NumpyMath:
+    exp = staticmethod(np.exp)
+    power = staticmethod(np.power)
+    floor = staticmethod(np.floor)
+    clip = staticmethod(np.clip)
+    where = staticmethod(np.where)
+    isnull = staticmethod(np.isnan)
+
+
+# Review histories of many cards as (cards, reviews) matrices, padded on the right
+def pad_histories(histories: list, max_reviews: int = 64) -> tuple:
+    length = min(max(len(ratings) for _, ratings in histories), max_reviews)
+    elapsed = np.zeros((len(histories), length))
+    ratings = np.ones((len(histories), length), dtype=np.int64)
+    mask = np.zeros((len(histories), length), dtype=bool)
+    for i, (days, grades) in enumerate(histories):
+        n = min(len(grades), length)
+        elapsed[i, :n] = days[:n]
+        ratings[i, :n] = grades[:n]
+        mask[i, :n] = True
+    return elapsed, ratings, mask
+
+
+# Replays padded histories under one or more parameter sets at once: w[i] is a scalar
+# or a (sets, 1) column, so every state array is (sets, cards). Returns the log loss of
+# the recall predicted before each non-first review and the final memory states.
+def replay(w, elapsed, ratings, mask) -> tuple:
+    cards = elapsed.shape[0]
+    shape = np.broadcast_shapes(np.shape(w[0]), (cards,))
+    stability = np.full(shape, np.nan)
+    difficulty = np.full(shape, np.nan)
+    loss = np.zeros(shape[:-1])
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        for k in range(elapsed.shape[1]):
+            if k:
+                r = np.clip(retrievability(elapsed[:, k], stability), 1e-6, 1 - 1e-6)
+                recalled = ratings[:, k] > 1
+                bce = -np.where(recalled, np.log(r), np.log(1 - r))
+                loss = loss + np.where(mask[:, k], bce, 0).sum(axis=-1)
+            s, d = step(w, stability, difficulty, elapsed[:, k], ratings[:, k], NumpyMath)
+            stability = np.where(mask[:, k], s, stability)
+            difficulty = np.where(mask[:, k], d, difficulty)
+    predictions = max(int(mask[:, 1:].sum()), 1)
+    return loss / predictions, stability, difficulty
+
+
+# Adam on the mean log loss with central-difference gradients; all 2 * 17 + 1 parameter
+# sets of an iteration are evaluated in a single vectorized replay
+def fit_parameters(histories: list, iterations: int = 150, learning_rate: float = 0.05,
+                   initial=DEFAULT_PARAMETERS) -> tuple:
+    elapsed, ratings, mask = pad_histories(histories)
+    low, high = (np.array(b, dtype=float) for b in zip(*PARAMETER_BOUNDS))
+    scale = high - low
+    params = np.clip(np.array(initial, dtype=float), low, high)
+    size = len(params)
+    offsets = np.vstack([np.zeros(size), np.eye(size), -np.eye(size)]) * (1e-4 * scale)
+    m, v = np.zeros(size), np.zeros(size)
+    initial_loss = None
+
+    for t in range(1, iterations + 1):
+        candidates = np.clip(params + offsets, low, high)
+        losses, _, _ = replay(candidates.T[:, :, None], elapsed, ratings, mask)
+        if initial_loss is None:
+            initial_loss = float(losses[0])
+        steps = candidates[1:size + 1].diagonal() - candidates[size + 1:].diagonal()
+        gradient = np.where(steps > 0, (losses[1:size + 1] - losses[size + 1:]) / np.where(steps > 0, steps, 1), 0)
+        m = 0.9 * m + 0.1 * gradient
+        v = 0.999 * v + 0.001 * gradient ** 2
+        direction = (m / (1 - 0.9 ** t)) / (np.sqrt(v / (1 - 0.999 ** t)) + 1e-8)
+        # Steps are in units of each parameter's range so one learning rate suits all of them
+        params = np.clip(params - learning_rate * direction * scale / 10, low, high)
+
+    final_loss, _, _ = replay(params, elapsed, ratings, mask)
+    return params.tolist(), initial_loss, float(final_loss)
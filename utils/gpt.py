@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+import time
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+load_dotenv()
+
+GPT_MODEL = "gpt-3.5-turbo"
+
+# Per-worker limits (each uvicorn worker gets its own pool)
+GPT_MAX_CONCURRENCY = int(os.getenv("GPT_MAX_CONCURRENCY", "8"))
+GPT_REQUEST_TIMEOUT = float(os.getenv("GPT_REQUEST_TIMEOUT", "20"))
+GPT_QUEUE_TIMEOUT = float(os.getenv("GPT_QUEUE_TIMEOUT", "10"))
+GPT_MAX_RETRIES = int(os.getenv("GPT_MAX_RETRIES", "1"))
+
+FLASHCARD_SYSTEM_PROMPT = (
+    "You are a helpful assistant for language learners.\n"
+    "Given a vocabulary word, provide:\n"
+    "1. An accurate translation\n"
+    "2. A simple sentence using the word\n"
+    "3. A grammar note explaining its usage\n"
+    "4. The word's part of speech (Noun, Verb, Adjective, etc.)\n\n"
+    "Format your response as:\n"
+    "Translation: ...\nExample: ...\nNote: ...\nPOS: ..."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a helpful assistant for language learners.\n"
+    "For EACH vocabulary word you are given, provide:\n"
+    "1. An accurate translation\n"
+    "2. A simple sentence using the word\n"
+    "3. A grammar note explaining its usage\n"
+    "4. The word's part of speech (Noun, Verb, Adjective, etc.)\n\n"
+    "Respond with a JSON object of the form:\n"
+    '{"items": [{"word": "...", "translation": "...", "example": "...", "note": "...", "pos": "..."}]}\n'
+    "with exactly one item per input word, in the same order."
+)
+
+# Tokens budgeted per word in a multi-word completion
+BATCH_TOKENS_PER_WORD = 150
+
+FALLBACK_FLASHCARD = ("Translation unavailable", "Example not found.", "Note not found.", "N/A")
+
+
+class GPTQueueTimeout(Exception):
+    pass
+
+
+# Bounded pool of in-flight completions sharing one keep-alive HTTP client
+class GPTPool:
+    def __init__(self, max_concurrency: int, request_timeout: float, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=60,
+            ),
+            timeout=httpx.Timeout(request_timeout, connect=5.0),
+        )
+        self.client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=self._http_client,
+            max_retries=GPT_MAX_RETRIES,
+        )
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.queue_timeouts = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.total_latency = 0.0
+
+    async def _acquire(self):
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.queue_timeouts += 1
+            raise GPTQueueTimeout(f"No GPT slot available within {self.queue_timeout}s")
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - started
+        self.total_queue_wait += waited
+        self.max_queue_wait = max(self.max_queue_wait, waited)
+        self.in_flight += 1
+
+    def _release(self, started: float, ok: bool):
+        self.in_flight -= 1
+        self._semaphore.release()
+        self.total_latency += time.perf_counter() - started
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    async def complete(self, messages: list, **kwargs) -> str:
+        await self._acquire()
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = await self.client.chat.completions.create(
+                model=GPT_MODEL,
+                messages=messages,
+                **kwargs,
+            )
+            ok = True
+            return response.choices[0].message.content or ""
+        finally:
+            self._release(started, ok)
+
+    # Yields content deltas; the slot is held until the stream is exhausted or closed
+    async def stream(self, messages: list, **kwargs):
+        await self._acquire()
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = await self.client.chat.completions.create(
+                model=GPT_MODEL,
+                messages=messages,
+                stream=True,
+                **kwargs,
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            ok = True
+        finally:
+            self._release(started, ok)
+
+    def metrics(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_timeouts": self.queue_timeouts,
+            "avg_queue_wait_ms": round(self.total_queue_wait / finished * 1000, 2) if finished else 0.0,
+            "max_queue_wait_ms": round(self.max_queue_wait * 1000, 2),
+            "avg_latency_ms": round(self.total_latency / finished * 1000, 2) if finished else 0.0,
+        }
+
+    async def aclose(self):
+        await self.client.close()
+
+
+gpt_pool = GPTPool(GPT_MAX_CONCURRENCY, GPT_REQUEST_TIMEOUT, GPT_QUEUE_TIMEOUT)
+
+
+FLASHCARD_LINE_PREFIXES = {
+    "translation:": "translation",
+    "example:": "example",
+    "note:": "notes",
+    "pos:": "pos",
+}
+
+
+def parse_flashcard_line(line: str):
+    lowered = line.lower()
+    for prefix, field in FLASHCARD_LINE_PREFIXES.items():
+        if lowered.startswith(prefix):
+            return field, line.split(":", 1)[1].strip()
+    return None
+
+
+def parse_flashcard_content(content: str):
+    fields = {"translation": "", "example": "", "notes": "", "pos": ""}
+    for line in content.splitlines():
+        parsed = parse_flashcard_line(line)
+        if parsed:
+            fields[parsed[0]] = parsed[1]
+    return fields["translation"], fields["example"], fields["notes"], fields["pos"]
+
+
+async def generate_flashcard_with_gpt(word: str, source_lang: str, target_lang: str):
+    user_prompt = f"Word: '{word}'\nSource Language: {source_lang}\nTarget Language: {target_lang}"
+
+    try:
+        content = await gpt_pool.complete(
+            [
+                {"role": "system", "content": FLASHCARD_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=0.5,
+            max_tokens=200,
+        )
+        translation, example, note, pos = parse_flashcard_content(content)
+        return translation or "Translation unavailable", example, note, pos
+
+    except Exception as e:
+        print(f"[GPT Error] {str(e)}")
+        return FALLBACK_FLASHCARD
+
+
+# Yields (field, value) as soon as each "Field: ..." line of the completion is complete
+async def stream_flashcard_with_gpt(word: str, source_lang: str, target_lang: str):
+    user_prompt = f"Word: '{word}'\nSource Language: {source_lang}\nTarget Language: {target_lang}"
+
+    buffer = ""
+    async for delta in gpt_pool.stream(
+        [
+            {"role": "system", "content": FLASHCARD_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.5,
+        max_tokens=200,
+    ):
+        buffer += delta
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            parsed = parse_flashcard_line(line)
+            if parsed:
+                yield parsed
+    parsed = parse_flashcard_line(buffer)
+    if parsed:
+        yield parsed
+
+
+def normalize_word(word: str) -> str:
+    return " ".join(word.split()).casefold()
+
+
+def parse_batch_content(content: str, words: list) -> dict:
+    items = json.loads(content).get("items", [])
+    by_word = {normalize_word(w): w for w in words}
+    results = {}
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        word = by_word.get(normalize_word(str(item.get("word", ""))))
+        if word is None and len(items) == len(words):
+            word = words[i]  # model rewrote the headword; fall back to position
+        translation = str(item.get("translation") or "").strip()
+        if word is None or not translation:
+            continue
+        results[word] = (
+            translation,
+            str(item.get("example") or "").strip(),
+            str(item.get("note") or "").strip(),
+            str(item.get("pos") or "").strip(),
+        )
+    return results
+
+
+# Returns {word: (translation, example, note, pos)}; words the model skipped are absent
+async def generate_flashcards_batch_with_gpt(words: list, source_lang: str, target_lang: str) -> dict:
+    user_prompt = (
+        f"Source Language: {source_lang}\nTarget Language: {target_lang}\n"
+        f"Words: {json.dumps(words, ensure_ascii=False)}"
+    )
+
+    try:
+        content = await gpt_pool.complete(
+            [
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=0.5,
+            max_tokens=BATCH_TOKENS_PER_WORD * len(words),
+            response_format={"type": "json_object"},
+        )
+        return parse_batch_content(content, words)
+
+    except Exception as e:
+        print(f"[GPT Batch Error] {str(e)}")
+        return {}
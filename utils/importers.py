@@ -0,0 +1,169 @@
+import csv
+import html
+import json
+import os
+import re
+import tempfile
+import uuid
+from pydantic import ValidationError
+from api.schemas import FlashcardImportRow
+
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "50000"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Uploads larger than this are spooled to disk rather than held in memory
+IMPORT_SPOOL_BYTES = 1024 * 1024
+
+IMPORT_FORMATS = ("csv", "jsonl", "anki")
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/json-lines": "jsonl",
+    "text/tab-separated-values": "anki",
+}
+IMPORT_FIELDS = ("word", "translation", "phonetic", "pos", "example", "notes", "source_lang", "target_lang", "folder_id")
+COLUMN_ALIASES = {
+    "front": "word",
+    "back": "translation",
+    "pinyin": "phonetic",
+    "part_of_speech": "pos",
+    "folder": "folder_id",
+}
+# Field order of a plain Anki note export without a #columns header
+ANKI_FIELDS = ("word", "translation", "example", "notes")
+ANKI_SEPARATORS = {"tab": "\t", "comma": ",", "semicolon": ";", "pipe": "|", "space": " ", "colon": ":"}
+HTML_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+HTML_TAG = re.compile(r"<[^>]+>")
+
+
+class ImportTooLarge(Exception):
+    pass
+
+
+def detect_import_format(content_type: str | None) -> str | None:
+    if not content_type:
+        return None
+    return CONTENT_TYPE_FORMATS.get(content_type.split(";", 1)[0].strip().lower())
+
+
+# The request body is copied to a spooled temp file as it arrives, so a large
+# upload is never held in memory and rows can be read back while inserting
+async def spool_upload(chunks, max_bytes: int = IMPORT_MAX_BYTES):
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise ImportTooLarge(f"Upload exceeds {max_bytes} bytes")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def normalize_column(name: str) -> str:
+    name = "_".join(name.strip().lower().split())
+    return COLUMN_ALIASES.get(name, name)
+
+
+def strip_html(text: str) -> str:
+    return html.unescape(HTML_TAG.sub("", HTML_BREAK.sub("\n", text))).strip()
+
+
+# --- Parsers: each yields (line number, row dict, error) ---
+def iter_csv_rows(lines):
+    reader = csv.reader(lines)
+    header = None
+    line_number = 1
+    for values in reader:
+        if header is None:
+            header = [normalize_column(v) for v in values]
+        elif any(v.strip() for v in values):
+            yield line_number, dict(zip(header, values)), None
+        line_number = reader.line_num + 1
+
+
+def iter_jsonl_rows(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, {normalize_column(k): v for k, v in row.items()}, None
+
+
+# Anki "Notes in Plain Text" exports: optional #key:value headers, then quoted
+# delimiter-separated fields that may contain HTML
+def iter_anki_rows(lines):
+    separator, is_html, columns = "\t", True, ANKI_FIELDS
+    line_number = 0
+    body = []
+    for line in lines:
+        line_number += 1
+        if not line.startswith("#"):
+            body.append(line)
+            break
+        key, _, value = line[1:].rstrip("\r\n").partition(":")
+        key = key.strip().lower()
+        if key == "separator":
+            separator = ANKI_SEPARATORS.get(value.strip().lower(), value[:1] or separator)
+        elif key == "html":
+            is_html = value.strip().lower() == "true"
+        elif key == "columns":
+            columns = [normalize_column(c) for c in value.rstrip("\r\n").split(separator)]
+
+    def remaining():
+        yield from body
+        yield from lines
+
+    reader = csv.reader(remaining(), delimiter=separator)
+    first_line = line_number
+    for values in reader:
+        if any(v.strip() for v in values):
+            if is_html:
+                values = [strip_html(v) for v in values]
+            yield first_line, dict(zip(columns, values)), None
+        first_line = line_number + reader.line_num
+
+
+def iter_import_rows(text_file, fmt: str):
+    if fmt == "csv":
+        return iter_csv_rows(text_file)
+    if fmt == "jsonl":
+        return iter_jsonl_rows(text_file)
+    return iter_anki_rows(text_file)
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors())
+
+
+# Flashcard column values for one row, or ValueError with a message for the error list
+def validate_import_row(row: dict, defaults: dict, folder_ids: set) -> dict:
+    data = dict(defaults)
+    data.update({k: v for k, v in row.items() if k in IMPORT_FIELDS and v not in (None, "")})
+    try:
+        card = FlashcardImportRow(**data)
+    except ValidationError as e:
+        raise ValueError(format_validation_error(e))
+
+    word = card.word.strip()
+    if not word:
+        raise ValueError("Missing word")
+    if card.folder_id and card.folder_id not in folder_ids:
+        raise ValueError(f"Folder not found: {card.folder_id}")
+
+    values = card.dict()
+    values.update(id=str(uuid.uuid4()), word=word)
+    return values
@@ -0,0 +1,72 @@
+import os
+import re
+from functools import lru_cache
+from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+from langdetect.lang_detect_exception import LangDetectException
+
+LANGUAGE_CACHE_SIZE = int(os.getenv("LANGUAGE_CACHE_SIZE", "20000"))
+
+# Scripts used by a single language in practice; kana is checked before Han
+# because Japanese text mixes both
+SCRIPT_LANGUAGES = (
+    ("ja", re.compile(r"[\u3040-\u30ff]")),
+    ("ko", re.compile(r"[\u1100-\u11ff\uac00-\ud7af]")),
+    ("zh", re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")),
+    ("el", re.compile(r"[\u0370-\u03ff]")),
+    ("th", re.compile(r"[\u0e00-\u0e7f]")),
+)
+# Latin letters that, absent markers of other languages, mean French
+FRENCH_MARKERS = re.compile(r"[àâæçèéêëîïôœùûÿ]", re.IGNORECASE)
+OTHER_LATIN_MARKERS = re.compile(r"[ñáíóúãõäöß¿¡ìòå]", re.IGNORECASE)
+LETTERS = re.compile(r"[^\W\d_]")
+
+# langdetect's module-level factory loads its profiles on first call and leaves the
+# detector unseeded, so short inputs can flip between runs. This one is loaded
+# once at import and seeded, so the same text always gets the same answer.
+_factory = DetectorFactory()
+_factory.load_profile(PROFILES_DIRECTORY)
+_factory.set_seed(0)
+
+
+def normalize_language_code(lang: str) -> str:
+    # langdetect reports "zh-cn" / "zh-tw"; the rest of the app uses "zh"
+    return lang.split("-", 1)[0]
+
+
+def detect_script_language(text: str) -> str | None:
+    for lang, pattern in SCRIPT_LANGUAGES:
+        if pattern.search(text):
+            return lang
+    if FRENCH_MARKERS.search(text) and not OTHER_LATIN_MARKERS.search(text):
+        return "fr"
+    return None
+
+
+def detect_statistical_language(text: str, threshold: float) -> str:
+    try:
+        detector = _factory.create()
+        detector.append(text)
+        langs = detector.get_probabilities()
+    except LangDetectException:
+        return "unknown"
+    if langs and langs[0].prob >= threshold:
+        return normalize_language_code(langs[0].lang)
+    return "unknown"
+
+
+@lru_cache(maxsize=LANGUAGE_CACHE_SIZE)
+def _detect(text: str, threshold: float) -> str:
+    if not LETTERS.search(text):
+        return "unknown"
+    return detect_script_language(text) or detect_statistical_language(text, threshold)
+
+
+# lower() rather than casefold() for the cache key: casefold turns ß into "ss", which
+# would hide it from the marker checks
+def detect_language(text: str, threshold: float = 0.8) -> str:
+    return _detect(" ".join(text.split()).lower(), threshold)
+
+
+def language_cache_metrics() -> dict:
+    info = _detect.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
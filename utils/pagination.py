@@ -0,0 +1,22 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+
+# Opaque keyset cursor: the sort key of the last row on a page, as url-safe base64 JSON
+def encode_cursor(*values) -> str:
+    payload = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ValueError("Malformed cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    return values
@@ -0,0 +1,78 @@
+import os
+from functools import lru_cache
+from pypinyin import pinyin, Style
+from pypinyin.contrib.tone_convert import to_tone3
+from utils.ttlcache import TTLCache
+
+PHONETIC_CACHE_SIZE = int(os.getenv("PHONETIC_CACHE_SIZE", "50000"))
+
+# Not a Han character, so pypinyin never segments a phrase across it
+WORD_SEPARATOR = "\x00"
+
+
+# Keep separators, drop everything else pypinyin can't convert (same as errors="ignore")
+def _keep_separators(chars: str) -> list:
+    return [WORD_SEPARATOR] * chars.count(WORD_SEPARATOR)
+
+
+# "lǜ" -> "lv4", "ma" -> "ma"; a few thousand distinct syllables at most
+@lru_cache(maxsize=4096)
+def tone_mark_to_number(syllable: str) -> str:
+    return to_tone3(syllable)
+
+
+# Pinyin with tone marks is the cached form; tone numbers are derived from it
+class PhoneticService:
+    def __init__(self, maxsize: int):
+        self.cache = TTLCache(maxsize, 0)  # pinyin never goes stale
+        self.conversions = 0
+
+    def _convert(self, words: list) -> list:
+        self.conversions += 1
+        syllables = pinyin(WORD_SEPARATOR.join(words), style=Style.TONE, errors=_keep_separators)
+        converted, current = [], []
+        for (syllable,) in syllables:
+            if syllable == WORD_SEPARATOR:
+                converted.append(tuple(current))
+                current = []
+            else:
+                current.append(syllable)
+        converted.append(tuple(current))
+        return converted
+
+    # {word: syllables}; uncached words are converted together in one pypinyin call
+    def syllables_many(self, words) -> dict:
+        found, missing = {}, []
+        for word in dict.fromkeys(words):
+            cached = self.cache.get(word)
+            if cached is None:
+                missing.append(word)
+            else:
+                found[word] = cached
+        if missing:
+            for word, syllables in zip(missing, self._convert(missing)):
+                self.cache.set(word, syllables)
+                found[word] = syllables
+        return found
+
+    def syllables(self, word: str) -> tuple:
+        return self.syllables_many([word])[word]
+
+    @staticmethod
+    def render(syllables: tuple, tone_marks: bool = False) -> str:
+        if tone_marks:
+            return " ".join(syllables)
+        return " ".join(tone_mark_to_number(s) for s in syllables)
+
+    def phonetic(self, word: str, tone_marks: bool = False) -> str:
+        return self.render(self.syllables(word), tone_marks)
+
+    def phonetic_many(self, words: list, tone_marks: bool = False) -> list:
+        syllables = self.syllables_many(words)
+        return [self.render(syllables[word], tone_marks) for word in words]
+
+    def metrics(self) -> dict:
+        return {**self.cache.metrics(), "conversions": self.conversions}
+
+
+phonetic_service = PhoneticService(PHONETIC_CACHE_SIZE)
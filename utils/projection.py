@@ -0,0 +1,54 @@
+from functools import lru_cache
+from models import Flashcard
+
+# Top-level keys of FlashcardResponse; spaced_repetition expands to the SM-2 columns
+FLASHCARD_FIELDS = (
+    "id", "word", "translation", "phonetic", "pos", "example", "notes",
+    "source_lang", "target_lang", "user_id", "created_at", "folder_id", "spaced_repetition",
+)
+SPACED_REPETITION_FIELDS = ("review_count", "interval", "ease_factor", "last_reviewed", "next_review_date")
+
+
+# "word,translation" -> ("word", "translation"); None or "" means every field
+def parse_fields(fields: str | None) -> tuple:
+    if not fields:
+        return FLASHCARD_FIELDS
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in FLASHCARD_FIELDS]
+    if unknown or not requested:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(FLASHCARD_FIELDS)}")
+    return requested
+
+
+# Columns to select for a field set, in the order row_serializer expects
+def projection_columns(fields: tuple) -> list:
+    columns = Flashcard.__table__.columns
+    flat = [columns[f] for f in fields if f != "spaced_repetition"]
+    if "spaced_repetition" in fields:
+        flat.extend(columns[f] for f in SPACED_REPETITION_FIELDS)
+    return flat
+
+
+# Row tuple -> response dict, shaped like FlashcardResponse restricted to fields
+@lru_cache(maxsize=256)
+def row_serializer(fields: tuple):
+    flat = tuple(f for f in fields if f != "spaced_repetition")
+    if "spaced_repetition" not in fields:
+        return lambda row: dict(zip(flat, row))
+
+    start, end = len(flat), len(flat) + len(SPACED_REPETITION_FIELDS)
+
+    def serialize(row):
+        card = dict(zip(flat, row))
+        card["spaced_repetition"] = dict(zip(SPACED_REPETITION_FIELDS, row[start:end]))
+        return card
+    return serialize
+
+
+# Quiz reverse cards: prompt with the translation, answer with the word
+def reverse_card(card: dict) -> dict:
+    reversed_card = dict(card)
+    for a, b in (("word", "translation"), ("source_lang", "target_lang")):
+        if a in card and b in card:
+            reversed_card[a], reversed_card[b] = card[b], card[a]
+    return reversed_card
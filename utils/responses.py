@@ -0,0 +1,116 @@
+import json
+import os
+from datetime import date, datetime
+from functools import lru_cache
+from fastapi import Header
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for Accept: application/msgpack
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# Opt-in fast path. Without it, JSON responses are encoded as before: shaped rows with
+# the stdlib encoder and model instances through FastAPI's response_model. With
+# FAST_RESPONSES=1, JSON goes through orjson (when installed) and models through a
+# precompiled pydantic serializer. Clients opt in to MessagePack per request with
+# Accept: application/msgpack regardless of this setting.
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "0") == "1"
+
+
+# Dates are written the way the response models render them: SpacedRepetitionMetadata
+# types its dates as datetime, so a date becomes midnight
+def encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def dumps_json(content, fast: bool = False) -> bytes:
+    if fast and orjson is not None:
+        # Dates go through encode_value too so both encoders produce the same output
+        return orjson.dumps(content, default=encode_value, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(content, default=encode_value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_msgpack(content) -> bytes:
+    return msgpack.packb(content, default=encode_value)
+
+
+# Built once per response type; pydantic-core serializes instances without revalidating them
+@lru_cache(maxsize=None)
+def type_adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+class ResponseEncoder:
+    def __init__(self, use_msgpack: bool = False, fast: bool = False, response: Response | None = None):
+        self.use_msgpack = use_msgpack
+        self.fast = fast
+        # FastAPI's per-request response, which carries headers for content returned as-is
+        self._response = response
+
+    # content is plain data (dicts/lists/scalars) or, when model is given, instances of model
+    def response(self, content, model=None, status_code: int = 200, headers: dict | None = None):
+        headers = {"Vary": "Accept", **(headers or {})}
+        if self.use_msgpack:
+            if model is not None:
+                content = type_adapter(model).dump_python(content, mode="json")
+            body, media_type = dumps_msgpack(content), "application/msgpack"
+        elif model is not None and not self.fast and self._response is not None:
+            # Default path: the endpoint's response_model validates and serializes it
+            self._response.status_code = status_code
+            self._response.headers.update(headers)
+            return content
+        else:
+            body = type_adapter(model).dump_json(content) if model is not None else dumps_json(content, self.fast)
+            media_type = "application/json"
+        return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+# {media type: q} for an Accept header; malformed q-values count as 0 (not acceptable)
+def accept_qualities(accept: str) -> dict:
+    qualities = {}
+    for entry in accept.split(","):
+        media_type, *params = (part.strip() for part in entry.split(";"))
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        qualities[media_type] = max(q, qualities.get(media_type, 0.0))
+    return qualities
+
+
+# MessagePack only when a msgpack type is listed with q > 0 and ranks at least as high
+# as JSON (matched directly or through application/* and */*)
+def prefers_msgpack(accept: str | None) -> bool:
+    if not accept:
+        return False
+    qualities = accept_qualities(accept)
+    msgpack_q = max((qualities.get(t, 0.0) for t in MSGPACK_MEDIA_TYPES), default=0.0)
+    json_q = qualities.get("application/json", qualities.get("application/*", qualities.get("*/*", 0.0)))
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+# Dependency for endpoints with a fast path: MessagePack when the client asks for it,
+# orjson and precompiled serializers when FAST_RESPONSES is set
+def negotiate_encoding(response: Response, accept: str | None = Header(None)) -> ResponseEncoder:
+    wants_msgpack = prefers_msgpack(accept)
+    return ResponseEncoder(use_msgpack=wants_msgpack and msgpack is not None, fast=FAST_RESPONSES, response=response)
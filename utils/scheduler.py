@@ -0,0 +1,369 @@
+import math
+import os
+import random
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import Date, Float, Integer, bindparam, case, cast, func, literal, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from models import Flashcard, UserSettings
+from utils import fsrs
+from utils.ttlcache import TTLCache
+
+# SM-2 constants
+MIN_EASE_FACTOR = 1.3
+DEFAULT_EASE_FACTOR = 2.5
+PASSING_QUALITY = 3
+
+# Seconds a worker reuses a user's scheduler choice; settings writes on the same worker drop it
+SCHEDULER_CACHE_TTL = float(os.getenv("SCHEDULER_CACHE_TTL", "300"))
+
+# Days until a card rated "again" (quality 0-2) is shown again under FSRS. Its post-lapse
+# stability alone would put a mature card several days out; like SM-2, it is relearned
+# the next day instead.
+RELEARNING_INTERVAL = 1
+
+# Card state the batch path reads; schedulers write a subset of it plus next_review_date
+STATE_COLUMNS = ("review_count", "interval", "ease_factor", "stability", "difficulty", "last_reviewed")
+
+
+# One SM-2 step: (review_count, interval, ease_factor) after a review of quality 0-5
+def sm2(review_count: int, interval: int, ease_factor: float, quality: int) -> tuple:
+    if quality < PASSING_QUALITY:
+        return 0, 1, ease_factor
+
+    review_count += 1
+    if review_count == 1:
+        interval = 1
+    elif review_count == 2:
+        interval = 6
+    else:
+        interval = int(interval * ease_factor)
+    ease_factor = max(MIN_EASE_FACTOR, ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
+    return review_count, interval, ease_factor
+
+
+# sm2 over arrays in one pass; the float arithmetic runs in the same order as sm2 so
+# both give identical results
+def sm2_many(review_count, interval, ease_factor, quality) -> tuple:
+    review_count = np.asarray(review_count, dtype=np.int64)
+    interval = np.asarray(interval, dtype=np.int64)
+    ease_factor = np.asarray(ease_factor, dtype=np.float64)
+    quality = np.asarray(quality, dtype=np.int64)
+
+    passed = quality >= PASSING_QUALITY
+    count = np.where(passed, review_count + 1, 0)
+    grown = (interval * ease_factor).astype(np.int64)
+    interval = np.select([~passed | (count == 1), count == 2], [1, 6], grown)
+    lapse = 5 - quality
+    adjusted = np.maximum(MIN_EASE_FACTOR, ease_factor + (0.1 - lapse * (0.08 + lapse * 0.02)))
+    ease_factor = np.where(passed, adjusted, ease_factor)
+    return count, interval, ease_factor
+
+
+# The utils.fsrs formulas as SQL. The rating of a single review is a Python int, so
+# conditions on it are plain bools and only the branch taken is emitted.
+class SQLMath:
+    @staticmethod
+    def exp(x):
+        return math.exp(x) if isinstance(x, (int, float)) else func.exp(x)
+
+    @staticmethod
+    def power(x, y):
+        return func.power(x, y)
+
+    @staticmethod
+    def floor(x):
+        return func.floor(x)
+
+    @staticmethod
+    def clip(x, low, high):
+        if isinstance(x, (int, float)):
+            return min(max(x, low), high)
+        return func.least(func.greatest(x, low), high)
+
+    @staticmethod
+    def where(condition, a, b):
+        if isinstance(condition, (bool, np.bool_)):
+            return a if condition else b
+        return case((condition, a), else_=b)
+
+    @staticmethod
+    def isnull(x):
+        return x.is_(None)
+
+
+# Load balancing: new intervals move by a random amount within a window that widens with
+# the interval (15% of the part between 2.5 and 7 days, 10% up to 20, 5% beyond, plus a
+# day), so cards that would all come due on one day spread over the days around it.
+# u is uniform in [-1, 1]; intervals under 2.5 days are left alone.
+FUZZ_RANGES = ((2.5, 7.0, 0.15), (7.0, 20.0, 0.1), (20.0, fsrs.MAX_INTERVAL, 0.05))
+
+
+def fuzz_interval(interval, u, xp=fsrs.NumpyMath):
+    delta = 1.0
+    for start, end, factor in FUZZ_RANGES:
+        delta = delta + factor * (xp.clip(interval, start, end) - start)
+    fuzzed = xp.clip(xp.floor(interval + u * delta + 0.5), 2, fsrs.MAX_INTERVAL)
+    return xp.where(interval < 2.5, interval, fuzzed)
+
+
+# FSRS memory state after a review, seeded from the SM-2 state for cards that have none.
+# Both schedulers keep it current, so switching to FSRS starts from each card's history.
+def memory_state(w, stability, difficulty, interval, ease_factor, elapsed, rating, xp):
+    stability, difficulty = fsrs.seed_state(stability, difficulty, interval, ease_factor, xp)
+    return fsrs.step(w, stability, difficulty, elapsed, rating, xp)
+
+
+def array_memory_state(w, state: dict, quality: np.ndarray, elapsed: np.ndarray):
+    # NaN stability (no FSRS state yet) flows through the unused branch
+    with np.errstate(invalid="ignore"):
+        return memory_state(
+            w, state["stability"], state["difficulty"], state["interval"], state["ease_factor"],
+            elapsed, fsrs.to_rating(quality), fsrs.NumpyMath,
+        )
+
+
+# Schedules by SM-2 and tracks FSRS memory state alongside, under the user's fitted
+# parameters when there are any
+class SM2Scheduler:
+    name = "sm2"
+
+    def __init__(self, load_balance: bool = False, parameters=None):
+        self.load_balance = load_balance
+        self.w = tuple(parameters or fsrs.DEFAULT_PARAMETERS)
+
+    # New card state as SQL over the columns of card_state, so the database applies the
+    # step without a prior read. The ease adjustment is computed here so the float
+    # arithmetic matches sm2.
+    def assignments(self, quality: int, card) -> dict:
+        rating = int(fsrs.to_rating(quality))
+        stability, difficulty = fsrs.step(self.w, card.stability, card.difficulty, card.elapsed, rating, SQLMath)
+
+        if quality < PASSING_QUALITY:
+            return {
+                "review_count": literal(0),
+                "interval": literal(1),
+                "ease_factor": card.ease_factor,
+                "stability": stability,
+                "difficulty": difficulty,
+            }
+
+        review_count = card.review_count + 1
+        grown = cast(func.trunc(card.interval * card.ease_factor), Integer)
+        lapse = 5 - quality
+        return {
+            "review_count": review_count,
+            "interval": case((review_count == 1, 1), (review_count == 2, 6), else_=grown),
+            "ease_factor": func.greatest(MIN_EASE_FACTOR, card.ease_factor + (0.1 - lapse * (0.08 + lapse * 0.02))),
+            "stability": stability,
+            "difficulty": difficulty,
+        }
+
+    # Interval over the columns produced by assignments
+    def scheduled_interval(self, state, quality: int):
+        return state.interval
+
+    # One vectorized step over arrays of card state (see schedule_reviews)
+    def step(self, state: dict, quality: np.ndarray, elapsed: np.ndarray) -> dict:
+        count, interval, ease_factor = sm2_many(state["review_count"], state["interval"], state["ease_factor"], quality)
+        stability, difficulty = array_memory_state(self.w, state, quality, elapsed)
+        return {
+            "review_count": count,
+            "interval": interval,
+            "ease_factor": ease_factor,
+            "stability": stability,
+            "difficulty": difficulty,
+        }
+
+
+class FSRSScheduler:
+    name = "fsrs"
+
+    def __init__(self, parameters=None, desired_retention: float | None = None, load_balance: bool = False):
+        self.w = tuple(parameters or fsrs.DEFAULT_PARAMETERS)
+        self.retention = desired_retention or fsrs.DEFAULT_RETENTION
+        self.load_balance = load_balance
+
+    # review_count keeps its SM-2 meaning (passing reviews in a row); ease_factor is left
+    # alone so switching back to SM-2 resumes from it
+    def assignments(self, quality: int, card) -> dict:
+        rating = int(fsrs.to_rating(quality))
+        stability, difficulty = fsrs.step(self.w, card.stability, card.difficulty, card.elapsed, rating, SQLMath)
+        return {
+            "review_count": card.review_count + 1 if rating > 1 else literal(0),
+            "stability": stability,
+            "difficulty": difficulty,
+        }
+
+    # Computed a stage after assignments so the stability expression appears once
+    def scheduled_interval(self, state, quality: int):
+        if fsrs.to_rating(quality) == 1:
+            return literal(RELEARNING_INTERVAL)
+        return cast(fsrs.next_interval(state.stability, self.retention, SQLMath), Integer)
+
+    def step(self, state: dict, quality: np.ndarray, elapsed: np.ndarray) -> dict:
+        rating = fsrs.to_rating(quality)
+        stability, difficulty = array_memory_state(self.w, state, quality, elapsed)
+        return {
+            "review_count": np.where(rating > 1, state["review_count"] + 1, 0),
+            "interval": np.where(rating == 1, RELEARNING_INTERVAL, fsrs.next_interval(stability, self.retention)),
+            "stability": stability,
+            "difficulty": difficulty,
+        }
+
+
+DEFAULT_SCHEDULER = SM2Scheduler()
+
+_schedulers = TTLCache(10000, SCHEDULER_CACHE_TTL)
+
+
+def scheduler_from_settings(settings):
+    if settings is None:
+        return DEFAULT_SCHEDULER
+    load_balance = bool(settings.load_balance)
+    if settings.scheduler == FSRSScheduler.name:
+        return FSRSScheduler(settings.fsrs_params, settings.desired_retention, load_balance)
+    if load_balance or settings.fsrs_params:
+        return SM2Scheduler(load_balance, settings.fsrs_params)
+    return DEFAULT_SCHEDULER
+
+
+async def get_user_scheduler(db: AsyncSession, user_id: str):
+    scheduler = _schedulers.get(user_id)
+    if scheduler is None:
+        result = await db.execute(
+            select(
+                UserSettings.scheduler,
+                UserSettings.fsrs_params,
+                UserSettings.desired_retention,
+                UserSettings.load_balance,
+            )
+            .where(UserSettings.user_id == user_id)
+        )
+        scheduler = scheduler_from_settings(result.one_or_none())
+        _schedulers.set(user_id, scheduler)
+    return scheduler
+
+
+def invalidate_user_scheduler(user_id: str):
+    _schedulers.delete(user_id)
+
+
+# The state the SQL schedulers read, one row per card matching criteria: NULLs replaced
+# by defaults, FSRS memory state seeded from SM-2 and the days since the last review.
+# Locked so a concurrent review of the same card waits and then reads its result.
+def card_state(today, *criteria):
+    interval = func.coalesce(Flashcard.interval, 0)
+    ease_factor = func.coalesce(Flashcard.ease_factor, DEFAULT_EASE_FACTOR)
+    stability, difficulty = fsrs.seed_state(Flashcard.stability, Flashcard.difficulty, interval, ease_factor, SQLMath)
+    return select(
+        Flashcard.id,
+        func.coalesce(Flashcard.review_count, 0).label("review_count"),
+        interval.label("interval"),
+        ease_factor.label("ease_factor"),
+        stability.label("stability"),
+        difficulty.label("difficulty"),
+        cast(func.coalesce(today - Flashcard.last_reviewed, 0), Float).label("elapsed"),
+    ).where(*criteria).with_for_update().subquery("card")
+
+
+# UPDATE of the cards matching criteria for one review under the given scheduler, review
+# dates included. Each stage is a subquery whose results the next one reads as columns
+# (seeded state, memory state, interval, fuzz), so every formula appears once in the
+# statement instead of being pasted into each expression that uses its result.
+def review_update(scheduler, quality: int, *criteria, today: date | None = None):
+    today = bindparam("today", today or date.today(), type_=Date)
+    card = card_state(today, *criteria)
+    values = scheduler.assignments(quality, card.c)
+    stepped = select(card.c.id, *(value.label(name) for name, value in values.items())).subquery("stepped")
+
+    interval = scheduler.scheduled_interval(stepped.c, quality)
+    carried = [column for column in stepped.c if column.key != "interval"]
+    state = select(*carried, interval.label("interval")).subquery("scheduled")
+    if scheduler.load_balance:
+        u = bindparam("fuzz", random.uniform(-1, 1), type_=Float)
+        fuzzed = cast(fuzz_interval(state.c.interval, u, SQLMath), Integer)
+        carried = [column for column in state.c if column.key != "interval"]
+        state = select(*carried, fuzzed.label("interval")).subquery("balanced")
+
+    table = Flashcard.__table__
+    return (
+        update(table)
+        .where(table.c.id == state.c.id)
+        .values({
+            **{name: column for name, column in state.c.items() if name != "id"},
+            "last_reviewed": today,
+            "next_review_date": today + state.c.interval,
+        })
+    )
+
+
+# Replays reviews in order against card states keyed by id and returns the final state
+# of every reviewed card. Round k applies each card's k-th review, so a session that
+# rates the same card twice is handled in order while each round stays vectorized.
+def schedule_reviews(scheduler, states: dict, reviews: list, today: date | None = None) -> dict:
+    today = today or date.today()
+    rounds = []
+    seen = {}
+    for flashcard_id, quality in reviews:
+        k = seen.get(flashcard_id, 0)
+        seen[flashcard_id] = k + 1
+        if k == len(rounds):
+            rounds.append(([], []))
+        rounds[k][0].append(flashcard_id)
+        rounds[k][1].append(quality)
+
+    current = {}
+    for flashcard_id in seen:
+        state = {column: states[flashcard_id][column] for column in STATE_COLUMNS}
+        state["review_count"] = state["review_count"] or 0
+        state["interval"] = state["interval"] or 0
+        if state["ease_factor"] is None:
+            state["ease_factor"] = DEFAULT_EASE_FACTOR
+        current[flashcard_id] = state
+
+    for ids, qualities in rounds:
+        cards = [current[i] for i in ids]
+        arrays = {
+            column: np.array([np.nan if card[column] is None else card[column] for card in cards], dtype=float)
+            for column in STATE_COLUMNS if column != "last_reviewed"
+        }
+        elapsed = np.array([(today - card["last_reviewed"]).days if card["last_reviewed"] else 0 for card in cards], dtype=float)
+        changes = scheduler.step(arrays, np.array(qualities), elapsed)
+        if scheduler.load_balance:
+            changes["interval"] = fuzz_interval(changes["interval"], np.random.uniform(-1, 1, len(cards)))
+        for column, values in changes.items():
+            for card, value in zip(cards, values.tolist()):
+                card[column] = value
+        for card in cards:
+            card["last_reviewed"] = today
+
+    for state in current.values():
+        state["review_count"] = int(state["review_count"])
+        state["interval"] = int(state["interval"])
+        state["next_review_date"] = today + timedelta(days=state["interval"])
+    return current
+
+
+# Cards coming due on each of the next `days` days, overdue ones counted today. One
+# GROUP BY over ix_flashcard_user_due for a user, or over ix_flashcard_due when user_id
+# is None and every user is covered.
+async def review_forecast(db: AsyncSession, days: int, user_id: str | None = None) -> list:
+    today = date.today()
+    query = (
+        select(Flashcard.next_review_date, func.count())
+        .where(Flashcard.next_review_date < today + timedelta(days=days))
+        .group_by(Flashcard.next_review_date)
+    )
+    if user_id is not None:
+        query = query.where(Flashcard.user_id == user_id)
+    result = await db.execute(query)
+
+    counts = [0] * days
+    for due, count in result.all():
+        counts[max((due - today).days, 0)] += count
+    return [
+        {"date": (today + timedelta(days=i)).isoformat(), "count": count}
+        for i, count in enumerate(counts)
+    ]
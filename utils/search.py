@@ -0,0 +1,68 @@
+import re
+import unicodedata
+from utils.cedict import HAN_CHARACTER, get_cedict, to_simplified
+from utils.phonetic import phonetic_service
+
+# Tone numbers after a pinyin syllable: "ni3 hao3" -> "ni hao", "ni3hao3" -> "nihao"
+TONE_NUMBERS = re.compile(r"(?<=[a-z])[1-5](?!\d)")
+NON_WORD = re.compile(r"\W+")
+UMLAUT_TO_V = str.maketrans({c: "v" for c in "üǖǘǚǜ"})
+
+_warned_unfolded = False
+
+
+def strip_marks(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+# Applied to both stored text and queries: simplified characters, no tone marks or
+# numbers, no accents, casefolded words separated by single spaces
+def normalize_search_text(text: str | None) -> str:
+    if not text:
+        return ""
+    text = strip_marks(to_simplified(text)).casefold()
+    text = TONE_NUMBERS.sub("", text)
+    return " ".join(NON_WORD.sub(" ", text).split())
+
+
+# Toneless pinyin spellings of any Chinese in text: spaced, run together, and with ü as v
+def pinyin_terms(text: str) -> list:
+    if not text or not HAN_CHARACTER.search(text):
+        return []
+    syllables = phonetic_service.syllables(to_simplified(text))
+    plain = [strip_marks(s).casefold() for s in syllables]
+    terms = [" ".join(plain), "".join(plain)]
+    with_v = [strip_marks(s.translate(UMLAUT_TO_V)).casefold() for s in syllables]
+    if with_v != plain:
+        terms.extend([" ".join(with_v), "".join(with_v)])
+    return terms
+
+
+# Traditional -> simplified folding needs CEDICT. Text built without it keeps traditional
+# characters, so such cards only match traditional queries until the backfill reruns.
+def warn_if_unfolded(fields) -> None:
+    global _warned_unfolded
+    if _warned_unfolded or get_cedict() is not None:
+        return
+    if any(field and HAN_CHARACTER.search(field) for field in fields):
+        _warned_unfolded = True
+        print(
+            "[Search] CEDICT not loaded; search_text is being saved without traditional -> simplified "
+            "folding. Run scripts/backfill_search_text.py --rebuild once the dictionary is available."
+        )
+
+
+# Contents of Flashcard.search_text, which backs the trigram and full-text indexes
+def build_search_text(word: str, translation: str, phonetic: str | None = None,
+                      notes: str | None = None, example: str | None = None) -> str:
+    fields = (word, translation, phonetic, notes, example)
+    warn_if_unfolded(fields)
+    parts = [normalize_search_text(field) for field in fields]
+    parts.extend(pinyin_terms(word))
+    parts.extend(pinyin_terms(translation))
+    return " ".join(part for part in parts if part)
+
+
+def escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,172 @@
+import asyncio
+import importlib.util
+import os
+import threading
+from functools import lru_cache
+import numpy as np
+
+# Optional and only needed to embed queries. Checked without importing: importing it
+# loads torch, which would slow every worker's startup and hold memory even when
+# reverse lookup is disabled.
+HAS_SENTENCE_TRANSFORMERS = importlib.util.find_spec("sentence_transformers") is not None
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+SEMANTIC_EMBEDDINGS_PATH = os.getenv("SEMANTIC_EMBEDDINGS_PATH", os.path.join(DATA_DIR, "cedict_embeddings.npy"))
+SEMANTIC_METADATA_PATH = os.getenv("SEMANTIC_METADATA_PATH", os.path.join(DATA_DIR, "cedict_embeddings.tsv"))
+SEMANTIC_IVF_PATH = os.getenv("SEMANTIC_IVF_PATH", os.path.join(DATA_DIR, "cedict_embeddings.ivf.npz"))
+SEMANTIC_MODEL = os.getenv("SEMANTIC_MODEL", "all-MiniLM-L6-v2")
+SEMANTIC_NPROBE = int(os.getenv("SEMANTIC_NPROBE", "8"))
+
+# Rows converted to float32 at a time during an exact scan
+SCAN_CHUNK_ROWS = 16384
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+# Inverted-file index: rows grouped by nearest k-means centroid, stored contiguously by list
+def build_ivf(matrix: np.ndarray, n_lists: int, iterations: int = 10, sample_size: int = 50000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    sample_rows = rng.choice(len(matrix), size=min(sample_size, len(matrix)), replace=False)
+    sample = np.asarray(matrix[np.sort(sample_rows)], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        counts = np.bincount(assignment, minlength=n_lists)
+        nonempty = counts > 0
+        centroids[nonempty] = normalize_rows(sums[nonempty])
+
+    assignment = np.concatenate([
+        np.argmax(np.asarray(matrix[i:i + SCAN_CHUNK_ROWS], dtype=np.float32) @ centroids.T, axis=1)
+        for i in range(0, len(matrix), SCAN_CHUNK_ROWS)
+    ])
+    order = np.argsort(assignment, kind="stable").astype(np.int32)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))]).astype(np.int64)
+    return centroids.astype(np.float32), order, offsets
+
+
+class SemanticIndex:
+    def __init__(self, matrix: np.ndarray, metadata: list, ivf=None):
+        self.matrix = matrix  # (rows, dim) unit-length float16, usually an mmap
+        self.metadata = metadata
+        self.ivf = ivf
+        self.queries = 0
+
+    @classmethod
+    def load(cls, embeddings_path: str, metadata_path: str, ivf_path: str | None = None):
+        matrix = np.load(embeddings_path, mmap_mode="r")
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            next(f)  # header
+            metadata = [tuple(line.rstrip("\n").split("\t")) for line in f]
+        if len(metadata) != len(matrix):
+            raise ValueError(f"{metadata_path} has {len(metadata)} rows but {embeddings_path} has {len(matrix)}")
+
+        ivf = None
+        if ivf_path and os.path.exists(ivf_path):
+            with np.load(ivf_path) as data:
+                ivf = (data["centroids"], data["order"], data["offsets"])
+        return cls(matrix, metadata, ivf)
+
+    def _exact_scores(self, query: np.ndarray):
+        scores = np.empty(len(self.matrix), dtype=np.float32)
+        for i in range(0, len(self.matrix), SCAN_CHUNK_ROWS):
+            scores[i:i + SCAN_CHUNK_ROWS] = np.asarray(self.matrix[i:i + SCAN_CHUNK_ROWS], dtype=np.float32) @ query
+        return np.arange(len(self.matrix)), scores
+
+    def _ivf_scores(self, query: np.ndarray, nprobe: int):
+        centroids, order, offsets = self.ivf
+        lists = np.argpartition(-(centroids @ query), min(nprobe, len(centroids)) - 1)[:nprobe]
+        rows = np.sort(np.concatenate([order[offsets[l]:offsets[l + 1]] for l in lists]))
+        return rows, np.asarray(self.matrix[rows], dtype=np.float32) @ query
+
+    # Top-k headwords for a unit-length query vector; one result per simplified form
+    def search(self, query: np.ndarray, k: int = 10, exact: bool = False, nprobe: int = SEMANTIC_NPROBE) -> list:
+        self.queries += 1
+        query = normalize_rows(np.asarray(query, dtype=np.float32))
+        if self.ivf is not None and not exact:
+            rows, scores = self._ivf_scores(query, nprobe)
+        else:
+            rows, scores = self._exact_scores(query)
+
+        # Several readings can share a headword, so over-fetch before de-duplicating
+        fetch = min(len(scores), k * 4)
+        if fetch == 0:
+            return []
+        top = np.argpartition(-scores, fetch - 1)[:fetch]
+        top = top[np.argsort(-scores[top])]
+
+        results, seen = [], set()
+        for i in top:
+            simplified, traditional, pinyin, definition = self.metadata[rows[i]]
+            if simplified in seen:
+                continue
+            seen.add(simplified)
+            results.append({
+                "simplified": simplified,
+                "traditional": traditional,
+                "pinyin": pinyin,
+                "definition": definition,
+                "score": round(float(scores[i]), 4),
+            })
+            if len(results) >= k:
+                break
+        return results
+
+    def metrics(self) -> dict:
+        return {
+            "loaded": True,
+            "rows": len(self.matrix),
+            "ivf_lists": len(self.ivf[0]) if self.ivf is not None else 0,
+            "queries": self.queries,
+        }
+
+
+_index: SemanticIndex | None = None
+_model = None
+_model_lock = threading.Lock()
+
+
+def load_semantic_index():
+    global _index
+    if not os.path.exists(SEMANTIC_EMBEDDINGS_PATH) or not os.path.exists(SEMANTIC_METADATA_PATH):
+        print(f"[Semantic] {SEMANTIC_EMBEDDINGS_PATH} not found; reverse lookup disabled")
+        return None
+    _index = SemanticIndex.load(SEMANTIC_EMBEDDINGS_PATH, SEMANTIC_METADATA_PATH, SEMANTIC_IVF_PATH)
+    print(f"[Semantic] Loaded {len(_index.matrix)} embeddings (IVF: {_index.ivf is not None})")
+    return _index
+
+
+def get_semantic_index() -> SemanticIndex | None:
+    return _index
+
+
+def semantic_available() -> bool:
+    return _index is not None and HAS_SENTENCE_TRANSFORMERS
+
+
+@lru_cache(maxsize=int(os.getenv("SEMANTIC_QUERY_CACHE_SIZE", "5000")))
+def _embed_query(text: str) -> np.ndarray:
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(SEMANTIC_MODEL)
+    return _model.encode(text, convert_to_numpy=True)
+
+
+# Model inference and the scan are CPU-bound, so both run off the event loop
+async def reverse_lookup(text: str, k: int = 10, exact: bool = False) -> list:
+    query = await asyncio.to_thread(_embed_query, " ".join(text.split()).casefold())
+    return await asyncio.to_thread(_index.search, query, k, exact)
+
+
+def semantic_metrics() -> dict:
+    if _index is None:
+        return {"loaded": False}
+    info = _embed_query.cache_info()
+    return {**_index.metrics(), "query_cache": {"hits": info.hits, "misses": info.misses, "size": info.currsize}}
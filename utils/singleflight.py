@@ -0,0 +1,60 @@
+import asyncio
+from functools import partial
+
+# Collapses concurrent calls for the same key onto one shared future
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.collapsed = 0
+        self.failures = 0
+
+    # Existing in-flight future for key, or None
+    def join(self, key):
+        future = self._calls.get(key)
+        if future is not None:
+            self.collapsed += 1
+        return future
+
+    # Registers the caller as the one doing the work; it must resolve the returned future
+    def lead(self, key) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        future.add_done_callback(partial(self._forget, key))
+        return future
+
+    def _forget(self, key, future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled() and future.exception() is not None:
+            self.failures += 1
+
+    # Runs fn() once per key; the work is shielded so a cancelled caller doesn't cancel it for the others
+    async def do(self, key, fn):
+        future = self.join(key)
+        if future is None:
+            future = self.lead(key)
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(partial(_settle, future))
+        return await asyncio.shield(future)
+
+    def metrics(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "collapsed": self.collapsed,
+            "failures": self.failures,
+        }
+
+
+def _settle(future: asyncio.Future, task: asyncio.Task):
+    if future.done():
+        return
+    if task.cancelled():
+        # A plain exception: CancelledError would cancel every follower's request too
+        future.set_exception(RuntimeError("Shared call cancelled"))
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
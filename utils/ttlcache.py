@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+
+# Kept free of database and API imports so pure helpers (utils.phonetic) and scripts can
+# cache without configuring a DATABASE_URL
+
+_MISSING = object()
+
+# In-process LRU with a per-entry time-to-live. With maxbytes, entries are also weighed
+# by sizeof(value) and the least recently used are evicted until the total fits.
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float, maxbytes: int | None = None, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._sizes = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = item
+        if expires_at is not None and expires_at < time.monotonic():
+            self._discard(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        self._weigh(key, value)
+        self._evict()
+
+    # Re-weighs an entry whose value grew or shrank in place, keeping its expiry
+    def resize(self, key):
+        item = self._data.get(key, _MISSING)
+        if item is not _MISSING:
+            self._weigh(key, item[1])
+            self._evict()
+
+    def delete(self, key):
+        return self._discard(key)
+
+    def purge(self, predicate=None) -> int:
+        if predicate is None:
+            count = len(self._data)
+            self._data.clear()
+            self._sizes.clear()
+            self.bytes = 0
+            return count
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def _weigh(self, key, value):
+        if self.sizeof is not None:
+            size = self.sizeof(value)
+            self.bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+
+    def _discard(self, key) -> bool:
+        if self._data.pop(key, _MISSING) is _MISSING:
+            return False
+        self.bytes -= self._sizes.pop(key, 0)
+        return True
+
+    # The newest entry is kept even when it alone exceeds maxbytes
+    def _evict(self):
+        while len(self._data) > self.maxsize or (
+            self.maxbytes is not None and self.bytes > self.maxbytes and len(self._data) > 1
+        ):
+            self._discard(next(iter(self._data)))
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            **({"bytes": self.bytes, "maxbytes": self.maxbytes} if self.maxbytes is not None else {}),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }